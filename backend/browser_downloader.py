@@ -5,45 +5,184 @@ This is a fallback mechanism when yt-dlp fails with 403 errors.
 import asyncio
 import os
 import re
+import shutil
+import time
 import logging
 from pathlib import Path
-from urllib.parse import urlparse, unquote
+
+# Optional dependencies: imported once here so the module still loads (and
+# callers get a clean error dict) when they are not installed.
+try:
+    import aiohttp
+    import aiofiles
+except ImportError:
+    aiohttp = aiofiles = None
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
 
 logger = logging.getLogger(__name__)
 
+VIDEO_SOURCE_SELECTOR = 'source[src*=".mp4"], video[src*=".mp4"]'
+
+# "720p" / "1080P" -> vertical resolution, "4K" -> multiples of 540 (4K = 2160)
+_QUALITY_RE = re.compile(r'(\d+)\s*[pP]|(\d+)\s*[kK]')
+
+
+def _quality_rank(quality: str) -> int:
+    """Numeric resolution for a quality label; 0 when it can't be parsed."""
+    m = _QUALITY_RE.search(quality or '')
+    if not m:
+        return 0
+    return int(m.group(1)) if m.group(1) else int(m.group(2)) * 540
+
+
+def _select_source(video_sources: list, quality: str = None):
+    """Pick the source closest to the requested quality, else the best one.
+
+    Sources are ranked once by parsed resolution. The sort is stable, so
+    among unlabelled sources the last <source> tag still wins, and a bare
+    <video src> is only used when the page has no <source> tags."""
+    candidates = [s for s in video_sources if s['quality'] != 'default'] or video_sources
+    ranked = sorted(candidates, key=lambda s: _quality_rank(s['quality']))
+    if quality:
+        wanted = _quality_rank(quality)
+        if wanted:
+            labelled = [s for s in ranked if _quality_rank(s['quality'])]
+            if labelled:
+                # Closest resolution; on a tie prefer the higher one
+                return min(reversed(labelled), key=lambda s: abs(_quality_rank(s['quality']) - wanted))
+        else:
+            needle = quality.lower()
+            for src in video_sources:
+                if needle in src['quality'].lower():
+                    return src
+    return ranked[-1] if ranked else None
+
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'stylesheet', 'media', 'websocket', 'manifest'})
+
+
+async def _block_heavy_resources(route):
+    """Playwright route handler aborting sub-resources the scraper never reads."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def _clean_title(title: str, limit: int) -> str:
+    """Truncate an (already sanitized) page title for use as a filename,
+    dropping trailing dots/spaces that Windows rejects."""
+    return title[:limit].rstrip(' .')
+
 
 class BrowserDownloader:
     """Downloads videos using a real browser to bypass Cloudflare protection."""
 
+    # Playwright keeps request/response bookkeeping alive until the context
+    # closes, so recycle the context (not the browser) every N operations.
+    ROTATE_EVERY = 25
+    # How long a page's extracted title/sources stay reusable, in seconds.
+    INFO_TTL = 120
+    INFO_CACHE_SIZE = 256
+    # Parallel Range requests for CDN downloads of at least SEGMENT_MIN_SIZE
+    SEGMENTS = 4
+    SEGMENT_MIN_SIZE = 16 * 1024 * 1024
+
     def __init__(self, download_dir: Path, progress_callback=None):
         self.download_dir = download_dir
         self.progress_callback = progress_callback
         self._browser = None
         self._context = None
         self._page = None
+        self._session = None
+        self._ops_since_rotate = 0
+        self._cookie_cache = (0.0, '')  # (monotonic timestamp, Cookie header)
+        self._info_cache = {}  # url -> (monotonic timestamp, info dict)
 
     async def _ensure_browser(self):
-        """Lazily initialize the browser."""
+        """Lazily initialize the browser, rotating its context periodically."""
         if self._browser is None:
-            from playwright.async_api import async_playwright
+            if async_playwright is None:
+                raise ImportError('playwright is not installed')
             self._playwright = await async_playwright().start()
             self._browser = await self._playwright.chromium.launch(
                 headless=True,
+                chromium_sandbox=False,
+                ignore_default_args=['--enable-automation'],
                 args=[
                     '--disable-blink-features=AutomationControlled',
                     '--no-sandbox',
                     '--disable-setuid-sandbox',
+                    # Subsystems a headless downloader never uses; dropping
+                    # them trims startup time and per-context memory.
+                    '--disable-gpu',
+                    '--disable-dev-shm-usage',
+                    '--disable-extensions',
+                    '--disable-background-networking',
+                    '--disable-background-timer-throttling',
+                    '--disable-translate',
+                    '--disable-sync',
+                    '--metrics-recording-only',
+                    '--mute-audio',
+                    '--no-first-run',
+                    '--disable-features=Translate,BackForwardCache,MediaRouter',
                 ]
             )
+
+        if self._context is None or self._ops_since_rotate >= self.ROTATE_EVERY:
+            if self._context is not None:
+                await self._context.close()
             self._context = await self._browser.new_context(
                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36',
                 viewport={'width': 1920, 'height': 1080},
             )
+            # Only the DOM is needed; skip images, fonts, CSS and media
+            # fetches. Routed on the context so every tab gets it.
+            await self._context.route('**/*', _block_heavy_resources)
             self._page = await self._context.new_page()
+            self._ops_since_rotate = 0
+            self._cookie_cache = (0.0, '')
+
+        self._ops_since_rotate += 1
         return self._page
 
+    async def _goto(self, page, url: str, **kwargs):
+        """page.goto() that invalidates the cached Cookie header, since
+        navigation is what changes the context's cookies."""
+        self._cookie_cache = (0.0, '')
+        return await page.goto(url, **kwargs)
+
+    async def _cookie_header(self) -> str:
+        """The context's cookies as a Cookie header, reused for up to 10 s."""
+        fetched_at, header = self._cookie_cache
+        if fetched_at and time.monotonic() - fetched_at < 10:
+            return header
+        cookies = await self._context.cookies()
+        header = '; '.join(f"{c['name']}={c['value']}" for c in cookies)
+        self._cookie_cache = (time.monotonic(), header)
+        return header
+
+    def _ensure_session(self):
+        """Lazily create the aiohttp session shared by all CDN downloads, so
+        DNS lookups, TLS handshakes and pooled connections are reused."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=32, limit_per_host=8, ttl_dns_cache=300, force_close=False,
+                ),
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=60),
+                read_bufsize=1 << 20,
+            )
+        return self._session
+
     async def close(self):
-        """Close the browser."""
+        """Close the browser and the shared HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
         if self._browser:
             await self._browser.close()
             await self._playwright.stop()
@@ -51,56 +190,75 @@ class BrowserDownloader:
             self._context = None
             self._page = None
 
-    async def get_video_info(self, url: str) -> dict:
+    async def _fetch_info(self, url: str, page=None) -> dict:
         """
-        Get video information by visiting the page with a real browser.
-        Returns dict with title, video_urls, etc.
+        Navigate to a page once and extract its title and video sources.
+        Results are cached for INFO_TTL seconds so a get_video_info() followed
+        by download() for the same URL shares a single Cloudflare round-trip.
+        Pass `page` to navigate a specific tab instead of the shared one.
         """
-        try:
-            page = await self._ensure_browser()
+        now = time.monotonic()
+        cached = self._info_cache.get(url)
+        if cached and now - cached[0] < self.INFO_TTL:
+            return cached[1]
 
-            logger.info(f"[Browser] Navigating to {url}")
-            await page.goto(url, wait_until='networkidle', timeout=60000)
-
-            # Wait a bit for any Cloudflare challenge to complete
-            await asyncio.sleep(2)
+        if page is None:
+            page = await self._ensure_browser()
 
-            # Extract video sources from the page
-            video_sources = await page.evaluate('''() => {
-                const sources = [];
+        logger.info(f"[Browser] Navigating to {url}")
+        await self._goto(page, url, wait_until='domcontentloaded', timeout=30000)
 
-                // Check <source> tags
-                document.querySelectorAll('source[src*=".mp4"]').forEach(el => {
-                    sources.push({
-                        url: el.src,
-                        quality: el.getAttribute('quality') || 'unknown',
-                        type: el.type || 'video/mp4'
-                    });
-                });
-
-                // Check <video> tags
-                document.querySelectorAll('video[src*=".mp4"]').forEach(el => {
-                    sources.push({
-                        url: el.src,
-                        quality: 'default',
-                        type: 'video/mp4'
-                    });
+        # Wait for the video markup itself rather than network idle; pages
+        # with analytics beacons may never go idle. This also covers the time
+        # a Cloudflare challenge needs before redirecting to the real page.
+        try:
+            await page.wait_for_selector(VIDEO_SOURCE_SELECTOR, state='attached', timeout=20000)
+        except Exception as e:
+            logger.info(f"[Browser] No video element appeared on {url}: {e}")
+
+        # Collect <source>/<video> matches and the filename-safe title in a
+        # single round-trip; the browser does the sanitizing.
+        info = await page.evaluate(r'''(selector) => {
+            const sources = [];
+            document.querySelectorAll(selector).forEach(el => {
+                const isSource = el.tagName === 'SOURCE';
+                sources.push({
+                    url: el.src,
+                    quality: isSource ? (el.getAttribute('quality') || 'unknown') : 'default',
+                    type: (isSource && el.type) || 'video/mp4'
                 });
+            });
+            return {
+                sources,
+                title: document.title.replace(/[<>:"\/\\|?*\x00-\x1f]+/g, '').trim(),
+                page_url: location.href
+            };
+        }''', VIDEO_SOURCE_SELECTOR)
+
+        if info['sources']:
+            # Pages without sources (challenge not passed yet, wrong URL) are
+            # not cached so a retry navigates again.
+            cache = {k: v for k, v in self._info_cache.items() if now - v[0] < self.INFO_TTL}
+            while len(cache) >= self.INFO_CACHE_SIZE:
+                del cache[next(iter(cache))]  # evict the oldest entry
+            cache[url] = (now, info)
+            self._info_cache = cache
+        return info
 
-                return sources;
-            }''')
-
-            # Get page title
-            title = await page.title()
-            title = re.sub(r'[<>:"/\\|?*]', '', title)  # Remove invalid filename chars
-            title = title.strip()[:100]  # Limit length
+    async def get_video_info(self, url: str) -> dict:
+        """
+        Get video information by visiting the page with a real browser.
+        Returns dict with title, video_urls, etc.
+        """
+        try:
+            info = await self._fetch_info(url)
 
-            if not video_sources:
+            if not info['sources']:
                 return {'error': 'No video sources found on page'}
 
             return {
-                'title': title,
-                'sources': video_sources,
+                'title': _clean_title(info['title'], 100),
+                'sources': info['sources'],
                 'page_url': url
             }
 
@@ -108,7 +266,7 @@ class BrowserDownloader:
             logger.error(f"[Browser] Error getting video info: {e}")
             return {'error': str(e)}
 
-    async def download(self, url: str, output_path: str = None, quality: str = None) -> dict:
+    async def download(self, url: str, output_path: str = None, quality: str = None, page=None) -> dict:
         """
         Download a video using the browser to bypass Cloudflare.
 
@@ -116,54 +274,35 @@ class BrowserDownloader:
             url: The page URL containing the video
             output_path: Optional output file path
             quality: Preferred quality (e.g., '720P', '1080P', '4K')
+            page: Optional tab to load the page in (used by download_many)
 
         Returns:
             dict with 'success', 'file_path', or 'error'
         """
-        try:
-            page = await self._ensure_browser()
+        if async_playwright is None:
+            return {'error': 'Browser fallback not available (Playwright not installed)'}
 
+        try:
             logger.info(f"[Browser] Starting download from {url}")
 
-            # Navigate to the page
-            await page.goto(url, wait_until='networkidle', timeout=60000)
-            await asyncio.sleep(2)  # Wait for Cloudflare
-
-            # Get video sources
-            video_sources = await page.evaluate('''() => {
-                const sources = [];
-                document.querySelectorAll('source[src*=".mp4"]').forEach(el => {
-                    sources.push({
-                        url: el.src,
-                        quality: el.getAttribute('quality') || 'unknown'
-                    });
-                });
-                return sources;
-            }''')
+            info = await self._fetch_info(url, page)
+            if self._context is None:
+                await self._ensure_browser()
 
+            video_sources = info['sources']
             if not video_sources:
                 return {'error': 'No video sources found'}
 
-            # Select the best quality or requested quality
-            video_url = None
-            if quality:
-                for src in video_sources:
-                    if quality.lower() in src['quality'].lower():
-                        video_url = src['url']
-                        break
-
-            if not video_url:
-                # Default to highest quality (last in list usually) or first
-                video_url = video_sources[-1]['url'] if video_sources else None
+            # Select the requested quality, or the best available
+            source = _select_source(video_sources, quality)
+            video_url = source['url'] if source else None
 
             if not video_url:
                 return {'error': 'Could not determine video URL'}
 
             logger.info(f"[Browser] Downloading video from CDN: {video_url[:80]}...")
 
-            # Get page title for filename
-            title = await page.title()
-            title = re.sub(r'[<>:"/\\|?*]', '', title).strip()[:80]
+            title = _clean_title(info['title'], 80)
 
             if not output_path:
                 output_path = str(self.download_dir / f"{title}.mp4")
@@ -175,16 +314,15 @@ class BrowserDownloader:
 
             # Method 2: Try using CDP to download with all cookies
             logger.info("[Browser] Navigation method failed, trying CDP...")
-            return await self._download_with_cdp(page, video_url, output_path)
+            return await self._download_with_cdp(info['page_url'], video_url, output_path)
 
         except Exception as e:
-            logger.error(f"[Browser] Download error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[Browser] Download error: {e}")
             return {'error': str(e)}
 
     async def _download_via_navigation(self, video_url: str, output_path: str) -> dict:
         """Download by navigating browser directly to video URL to handle CDN's Cloudflare."""
+        download_page = None
         try:
             # Create a new page for downloading to not disrupt the main page
             download_page = await self._context.new_page()
@@ -197,7 +335,11 @@ class BrowserDownloader:
                 nonlocal download_path
                 download_started.set()
                 logger.info(f"[Browser] Download started: {download.suggested_filename}")
-                await download.save_as(output_path)
+                # save_as() copies synchronously; copy the finished temp file
+                # in a worker thread so the event loop stays responsive
+                # (copyfile uses the kernel's sendfile/fcopyfile fast paths).
+                src = await download.path()
+                await asyncio.to_thread(shutil.copyfile, src, output_path)
                 download_path = output_path
 
             download_page.on("download", handle_download)
@@ -208,7 +350,7 @@ class BrowserDownloader:
 
             try:
                 # Navigate with a longer timeout - videos take time
-                response = await download_page.goto(video_url, timeout=120000, wait_until='commit')
+                response = await self._goto(download_page, video_url, timeout=120000, wait_until='commit')
 
                 if response:
                     status = response.status
@@ -226,22 +368,20 @@ class BrowserDownloader:
                             logger.info("[Browser] Detected Cloudflare challenge, waiting for it to complete...")
                             await asyncio.sleep(10)
                             # Retry navigation after challenge
-                            response = await download_page.goto(video_url, timeout=120000, wait_until='commit')
+                            response = await self._goto(download_page, video_url, timeout=120000, wait_until='commit')
                             if response:
                                 status = response.status
 
                     if status == 200 and 'video' in content_type:
-                        # Stream the response body to file
-                        logger.info("[Browser] Streaming video response to file...")
-                        body = await response.body()
-                        with open(output_path, 'wb') as f:
-                            f.write(body)
+                        # The navigation only served to clear the CDN's
+                        # Cloudflare challenge. Drop the page (so Chromium
+                        # stops buffering the body) and stream the file with
+                        # the cookies it earned instead of response.body(),
+                        # which would hold the whole video in memory.
+                        referer = download_page.url
                         await download_page.close()
-                        return {
-                            'success': True,
-                            'file_path': output_path,
-                            'size': len(body)
-                        }
+                        logger.info("[Browser] Streaming video response to file...")
+                        return await self._stream_to_file(video_url, output_path, referer)
 
             except Exception as nav_error:
                 logger.warning(f"[Browser] Navigation error: {nav_error}")
@@ -264,52 +404,137 @@ class BrowserDownloader:
 
         except Exception as e:
             logger.warning(f"[Browser] Navigation download failed: {e}")
+            if download_page is not None and not download_page.is_closed():
+                await download_page.close()
             return {'error': str(e)}
 
-    async def _download_with_cdp(self, page, video_url: str, output_path: str) -> dict:
-        """Download using Chrome DevTools Protocol for streaming download."""
-        try:
-            # Get cookies from the browser context
-            cookies = await self._context.cookies()
-            cookie_header = '; '.join([f"{c['name']}={c['value']}" for c in cookies])
-
-            # Use aiohttp or httpx with the browser's cookies
-            import aiohttp
-
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36',
-                'Referer': page.url,
-                'Cookie': cookie_header,
-                'Accept': '*/*',
-            }
+    async def _request_headers(self, referer: str) -> dict:
+        """Headers for CDN requests: a desktop browser UA plus the browser
+        context's cookies, so they pass the same checks the page did."""
+        return {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36',
+            'Referer': referer,
+            'Cookie': await self._cookie_header(),
+            'Accept': '*/*',
+        }
+
+    async def _stream_to_file(self, video_url: str, output_path: str, referer: str) -> dict:
+        """Stream video_url to output_path, reusing the browser context's
+        cookies. Memory use stays at one read buffer regardless of file size;
+        a stream that fails midway removes its partial file."""
+        if aiohttp is None:
+            return {'error': 'aiohttp/aiofiles not installed'}
+
+        headers = await self._request_headers(referer)
+        session = self._ensure_session()
+        async with session.get(video_url, headers=headers) as response:
+            if response.status != 200:
+                return {'error': f'HTTP {response.status}'}
+
+            total_size = int(response.headers.get('content-length', 0))
+            downloaded = 0
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(video_url, headers=headers) as response:
-                    if response.status != 200:
-                        return {'error': f'HTTP {response.status}'}
+            try:
+                async with aiofiles.open(output_path, 'wb') as f:
+                    async for chunk in response.content.iter_any():
+                        await f.write(chunk)
+                        downloaded += len(chunk)
+
+                        if self.progress_callback and total_size:
+                            progress = (downloaded / total_size) * 100
+                            self.progress_callback(progress, downloaded, total_size)
+            except BaseException:
+                # Don't leave a truncated file that looks like a finished one
+                await asyncio.to_thread(Path(output_path).unlink, missing_ok=True)
+                raise
 
-                    total_size = int(response.headers.get('content-length', 0))
-                    downloaded = 0
+            return {
+                'success': True,
+                'file_path': output_path,
+                'size': downloaded
+            }
 
-                    with open(output_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-                            downloaded += len(chunk)
+    async def _download_with_cdp(self, referer: str, video_url: str, output_path: str) -> dict:
+        """Download using Chrome DevTools Protocol for streaming download."""
+        if aiohttp is None:
+            return {'error': 'aiohttp/aiofiles not installed'}
 
-                            if self.progress_callback and total_size:
-                                progress = (downloaded / total_size) * 100
-                                self.progress_callback(progress, downloaded, total_size)
+        try:
+            # Probe with the browser's cookies over the shared session
+            headers = await self._request_headers(referer)
+            session = self._ensure_session()
 
-                    return {
-                        'success': True,
-                        'file_path': output_path,
-                        'size': downloaded
-                    }
+            # Large files on range-capable CDNs are pulled as parallel
+            # segments; per-connection throttling caps a single stream.
+            # A failed probe only costs the parallel path, not the download
+            try:
+                async with session.head(video_url, headers=headers, allow_redirects=True) as head:
+                    total_size = int(head.headers.get('content-length', 0)) if head.status == 200 else 0
+                    ranged = head.headers.get('accept-ranges', '').lower() == 'bytes'
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.debug(f"[Browser] HEAD probe failed, using a single stream: {e}")
+                total_size, ranged = 0, False
+            if ranged and total_size >= self.SEGMENT_MIN_SIZE:
+                return await self._download_segmented(session, video_url, headers, output_path, total_size)
+
+            return await self._stream_to_file(video_url, output_path, referer)
 
         except Exception as e:
             logger.warning(f"[Browser] CDP download failed: {e}")
             return {'error': str(e)}
 
+    async def _download_segmented(self, session, video_url: str, headers: dict,
+                                  output_path: str, total_size: int) -> dict:
+        """Download total_size bytes as SEGMENTS parallel Range requests, each
+        writing its own slice of a pre-sized file through its own handle.
+        If any segment fails the others are cancelled and the partial file
+        is removed."""
+        async with aiofiles.open(output_path, 'wb') as f:
+            await f.truncate(total_size)
+
+        step = -(-total_size // self.SEGMENTS)  # ceil division
+        downloaded = 0
+
+        async def fetch(start, end):
+            nonlocal downloaded
+            seg_headers = {**headers, 'Range': f'bytes={start}-{end}'}
+            async with session.get(video_url, headers=seg_headers) as response:
+                if response.status != 206:
+                    raise RuntimeError(f'HTTP {response.status} for range {start}-{end}')
+                async with aiofiles.open(output_path, 'r+b') as f:
+                    await f.seek(start)
+                    async for chunk in response.content.iter_any():
+                        await f.write(chunk)
+                        downloaded += len(chunk)
+                        if self.progress_callback:
+                            progress = (downloaded / total_size) * 100
+                            self.progress_callback(progress, downloaded, total_size)
+
+        logger.info(f"[Browser] Downloading {total_size} bytes in {self.SEGMENTS} segments")
+        tasks = [
+            asyncio.create_task(fetch(start, min(start + step, total_size) - 1))
+            for start in range(0, total_size, step)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Stop the other segments writing into (and reporting progress
+            # for) a download that has already failed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.to_thread(Path(output_path).unlink, missing_ok=True)
+            raise
+
+        if downloaded != total_size:
+            await asyncio.to_thread(Path(output_path).unlink, missing_ok=True)
+            return {'error': f'Segmented download incomplete ({downloaded}/{total_size} bytes)'}
+        return {
+            'success': True,
+            'file_path': output_path,
+            'size': downloaded
+        }
+
 
 async def download_with_browser(url: str, output_dir: Path, quality: str = None, progress_callback=None) -> dict:
     """
@@ -332,6 +557,41 @@ async def download_with_browser(url: str, output_dir: Path, quality: str = None,
         await downloader.close()
 
 
+async def download_many(urls: list, output_dir: Path, quality: str = None,
+                        concurrency: int = 4, progress_callback=None) -> list:
+    """
+    Download several pages concurrently through one shared browser.
+
+    Each concurrency slot gets its own tab from a small pool, so at most
+    `concurrency` pages are open at once and the browser, its cookies and
+    the HTTP connection pool are shared by every download.
+
+    Returns:
+        list of result dicts, in the same order as `urls`
+    """
+    downloader = BrowserDownloader(output_dir, progress_callback)
+    results = [None] * len(urls)
+    try:
+        await downloader._ensure_browser()
+        pages = asyncio.Queue()
+        for _ in range(max(1, min(concurrency, len(urls)))):
+            pages.put_nowait(await downloader._context.new_page())
+
+        async def _bounded(index, url):
+            page = await pages.get()
+            try:
+                results[index] = await downloader.download(url, quality=quality, page=page)
+            finally:
+                pages.put_nowait(page)
+
+        # download() reports failures as result dicts, so one bad URL can't
+        # abort the others
+        await asyncio.gather(*(_bounded(index, url) for index, url in enumerate(urls)))
+        return results
+    finally:
+        await downloader.close()
+
+
 # Test function
 async def test_download():
     """Test the browser downloader."""
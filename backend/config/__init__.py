@@ -91,6 +91,8 @@ JWT_SECRET = _resolve_jwt_secret()
 
 # Download Configuration
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '6'))
+# Parallel range requests per large Telegram file (1 = sequential)
+DOWNLOAD_WORKERS = max(1, int(os.getenv('DOWNLOAD_WORKERS', '4')))
 
 # Screenshots directory for video thumbnails
 _screenshots_dir_env = os.getenv('SCREENSHOTS_DIR', '').strip().strip('"').strip("'")
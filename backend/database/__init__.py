@@ -1,83 +1,162 @@
 """
 Database module for DownLee
 """
+import os
+import hmac
+import atexit
+import threading
 import json
 import hashlib
 import uuid
-from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, BigInteger, String, Float, DateTime, Text, Boolean
+from contextlib import contextmanager
+from functools import lru_cache
+from sqlalchemy import bindparam, case, create_engine, event, false, func, insert, literal, make_url, or_, select, update, Index, Column, Integer, BigInteger, String, Float, DateTime, Text, Boolean
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.sql import expression
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 Base = declarative_base()
 
+# Fields written on every progress tick; updates touching only these are
+# coalesced per download and flushed in batches.
+PROGRESS_FIELDS = frozenset({'progress', 'speed', 'downloaded_bytes', 'total_bytes', 'pending_time'})
+PROGRESS_FLUSH_INTERVAL = 1.0  # seconds; live progress reaches the UI over Socket.IO, not the DB
+# Statuses whose row is final until an explicit (unbuffered) status change;
+# buffered progress arriving late must not overwrite them
+SETTLED_STATUSES = ('done', 'failed', 'stopped', 'paused')
+
+
+class EagerDefaults:
+    """Mixin for models with DB-side timestamps: fetch them via RETURNING
+    on flush instead of a lazy SELECT on first access."""
+    __mapper_args__ = {'eager_defaults': True}
+
+
+class utcnow(expression.FunctionElement):
+    """Current UTC timestamp, evaluated by the database. Used as column
+    default/onupdate so timestamps come from one clock without a Python
+    datetime per row; naive UTC like the rest of the schema."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return 'CURRENT_TIMESTAMP'  # UTC on SQLite
+
+
+@compiles(utcnow, 'postgresql')
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+class hour_bucket(expression.FunctionElement):
+    """A timestamp truncated to its hour, as 'YYYY-MM-DD HH' text."""
+    type = String()
+    inherit_cache = True
+
+
+@compiles(hour_bucket)
+def _hour_bucket_default(element, compiler, **kw):
+    return "strftime('%%Y-%%m-%%d %%H', %s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(hour_bucket, 'postgresql')
+def _hour_bucket_postgresql(element, compiler, **kw):
+    return "to_char(%s, 'YYYY-MM-DD HH24')" % compiler.process(element.clauses, **kw)
+
 
 def generate_uuid():
-    """Generate a UUID string for download tracking"""
-    return str(uuid.uuid4())
+    """Generate a UUID string (32 hex chars) for download tracking"""
+    return uuid.uuid4().hex
+
+
+def generate_uuids(n):
+    """n UUID strings like generate_uuid, from a single urandom read."""
+    raw = os.urandom(16 * n)
+    return [uuid.UUID(bytes=raw[i:i + 16], version=4).hex for i in range(0, 16 * n, 16)]
 
 
-class Download(Base):
+def is_generated_id(message_id):
+    """True for generated download IDs (hex or legacy hyphenated UUIDs),
+    False for Telegram message IDs, which are short numeric strings."""
+    return bool(message_id) and len(message_id) >= 32
+
+
+class Download(EagerDefaults, Base):
     """Download model representing a file download"""
     __tablename__ = 'downloads'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    message_id = Column(String(100), nullable=True)  # UUID or Telegram message ID as string
-    file = Column(String(500), nullable=False)
+    message_id = Column(String(100), nullable=True, index=True)  # UUID or Telegram message ID as string
+    file = Column(String(500), nullable=False, index=True)
     status = Column(String(50), default='downloading')
     progress = Column(Float, default=0)
     speed = Column(Float, default=0)
     error = Column(Text, nullable=True)
-    updated_at = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
     downloaded_bytes = Column(BigInteger, default=0)
     total_bytes = Column(BigInteger, default=0)
     pending_time = Column(Float, nullable=True)
     deleted_at = Column(DateTime, nullable=True, default=None)
-    downloaded_from = Column(String(100), default='telegram')  # 'telegram' or domain name
+    downloaded_from = Column(String(100), default='telegram', index=True)  # 'telegram' or domain name
     url = Column(Text, nullable=True)  # Source URL for yt-dlp downloads
-    file_deleted = Column(Boolean, default=False)  # True if physical file was deleted from disk
-    author = Column(String(200), nullable=True)  # username:id for telegram, username for downlee
+    file_deleted = Column(Boolean, nullable=False, default=False, server_default=false())  # True if physical file was deleted from disk
+    author = Column(String(200), nullable=True, index=True)  # username:id for telegram, username for downlee
     file_meta = Column(Text, nullable=True)  # JSON metadata: video/audio details for video files
     thumb_count = Column(Integer, default=0)  # Number of generated thumbnail images
     status_msg_id = Column(Integer, nullable=True)  # Telegram status message ID for progress updates
     chat_id = Column(BigInteger, nullable=True)  # Telegram chat the message came from (message_id is per-chat)
 
+    __table_args__ = (
+        # Listing query: WHERE deleted_at IS NULL ORDER BY updated_at DESC
+        Index('ix_downloads_active_updated', 'deleted_at', 'updated_at'),
+    )
+
     def to_dict(self):
         """Convert model to dictionary"""
+        return self.serialize(self)
+
+    @staticmethod
+    def serialize(d):
+        """Build the API dict from anything exposing the download columns as
+        attributes: a Download instance or a Core row from a column select."""
         return {
-            'id': self.id,
-            'message_id': self.message_id,
-            'file': self.file,
-            'status': self.status,
-            'progress': self.progress,
-            'speed': self.speed,
-            'error': self.error,
-            'updated_at': f"{self.updated_at.isoformat()}Z" if self.updated_at else None,
-            'created_at': f"{self.created_at.isoformat()}Z" if self.created_at else None,
-            'downloaded_bytes': self.downloaded_bytes,
-            'total_bytes': self.total_bytes,
-            'pending_time': self.pending_time,
-            'downloaded_from': self.downloaded_from or 'telegram',
-            'url': self.url,
-            'file_deleted': self.file_deleted or False,
-            'author': self.author,
-            'deleted_at': f"{self.deleted_at.isoformat()}Z" if self.deleted_at else None,
-            'file_meta': json.loads(self.file_meta) if self.file_meta else None,
-            'thumb_count': self.thumb_count or 0,
-            'status_msg_id': self.status_msg_id,
-            'chat_id': str(self.chat_id) if self.chat_id is not None else None,
+            'id': d.id,
+            'message_id': d.message_id,
+            'file': d.file,
+            'status': d.status,
+            'progress': d.progress,
+            'speed': d.speed,
+            'error': d.error,
+            'updated_at': f"{d.updated_at.isoformat()}Z" if d.updated_at else None,
+            'created_at': f"{d.created_at.isoformat()}Z" if d.created_at else None,
+            'downloaded_bytes': d.downloaded_bytes,
+            'total_bytes': d.total_bytes,
+            'pending_time': d.pending_time,
+            'downloaded_from': d.downloaded_from or 'telegram',
+            'url': d.url,
+            'file_deleted': d.file_deleted,
+            'author': d.author,
+            'deleted_at': f"{d.deleted_at.isoformat()}Z" if d.deleted_at else None,
+            'file_meta': json.loads(d.file_meta) if d.file_meta else None,
+            'thumb_count': d.thumb_count or 0,
+            'status_msg_id': d.status_msg_id,
+            'chat_id': str(d.chat_id) if d.chat_id is not None else None,
         }
 
 
-class Settings(Base):
+class Settings(EagerDefaults, Base):
     """Settings model for storing application configuration"""
     __tablename__ = 'settings'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     key = Column(String(100), unique=True, nullable=False)
     value = Column(Text, nullable=True)
-    updated_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
     def to_dict(self):
         """Convert model to dictionary"""
@@ -88,7 +167,7 @@ class Settings(Base):
         }
 
 
-class DownloadTypeMap(Base):
+class DownloadTypeMap(EagerDefaults, Base):
     """Download type mapping for folder organization and security"""
     __tablename__ = 'download_type_maps'
 
@@ -97,8 +176,8 @@ class DownloadTypeMap(Base):
     is_secured = Column(Boolean, default=False)
     folder = Column(String(255), nullable=True)
     quality = Column(String(20), nullable=True)  # Default quality e.g., "720p", "1080p"
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
     def to_dict(self):
         """Convert model to dictionary"""
@@ -120,12 +199,12 @@ class User(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     username = Column(String(100), unique=True, nullable=False)
-    password_hash = Column(String(64), nullable=True)  # SHA-256 hash; null for Telegram-only users
+    password_hash = Column(String(255), nullable=True)  # scrypt (legacy: SHA-256) hash; null for Telegram-only users
     role = Column(String(20), default='user')  # 'admin' or 'user'
     telegram_id = Column(BigInteger, nullable=True)  # set for Telegram users
     display_name = Column(String(200), nullable=True)
     must_change_password = Column(Boolean, default=False)  # force a new password on next web login
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
 
     def to_dict(self):
         """Convert model to dictionary (excludes password)"""
@@ -140,17 +219,41 @@ class User(Base):
             'created_at': f"{self.created_at.isoformat()}Z" if self.created_at else None
         }
 
+    # scrypt cost parameters (~16 MiB, tens of ms per hash)
+    SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 14, 8, 1
+
     @staticmethod
-    def hash_password(password: str) -> str:
-        """Hash a password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+    def legacy_hash(password: str) -> str:
+        """Unsalted SHA-256 hex digest used by older releases"""
+        return hashlib.sha256(password.encode('utf-8', 'ignore')).hexdigest()
+
+    @classmethod
+    def hash_password(cls, password: str) -> str:
+        """Hash a password with salted scrypt: scrypt$<salt hex>$<hash hex>"""
+        salt = os.urandom(16)
+        digest = hashlib.scrypt(password.encode('utf-8', 'ignore'), salt=salt,
+                                n=cls.SCRYPT_N, r=cls.SCRYPT_R, p=cls.SCRYPT_P)
+        return f"scrypt${salt.hex()}${digest.hex()}"
 
     def check_password(self, password: str) -> bool:
-        """Check if provided password matches"""
-        return self.password_hash == self.hash_password(password)
+        """Check if provided password matches (constant-time compare)"""
+        stored = self.password_hash or ''
+        if stored.startswith('scrypt$'):
+            try:
+                _, salt_hex, digest_hex = stored.split('$')
+                digest = hashlib.scrypt(password.encode('utf-8', 'ignore'), salt=bytes.fromhex(salt_hex),
+                                        n=self.SCRYPT_N, r=self.SCRYPT_R, p=self.SCRYPT_P)
+            except ValueError:
+                return False
+            return hmac.compare_digest(digest.hex(), digest_hex)
+        return bool(stored) and hmac.compare_digest(stored, self.legacy_hash(password))
 
+    def needs_rehash(self) -> bool:
+        """True while the stored hash is still the legacy SHA-256 format"""
+        return bool(self.password_hash) and not self.password_hash.startswith('scrypt$')
 
-class BotQuery(Base):
+
+class BotQuery(EagerDefaults, Base):
     """A bot chat command: tagging the bot with `key` runs `command` (shell)
     and replies with its output. Admin-only."""
     __tablename__ = 'bot_queries'
@@ -158,8 +261,8 @@ class BotQuery(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     key = Column(String(64), unique=True, nullable=False)
     command = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
     def to_dict(self):
         return {
@@ -185,7 +288,7 @@ class VpsWatchFolder(Base):
     # Per-folder download specs: local destination + hide from the default view
     folder = Column(String(255), nullable=True)
     is_secured = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
 
     def to_dict(self):
         return {
@@ -201,26 +304,157 @@ class VpsWatchFolder(Base):
         }
 
 
+# Hot lookups built once at import with bound parameters, so every call
+# reuses the same statement object and hits the compiled-SQL cache.
+_GET_BY_FILE = select(Download).where(Download.file == bindparam('file')).limit(1)
+_GET_BY_ID = select(Download).where(Download.id == bindparam('id'))
+_GET_BY_MSG = (select(Download).where(Download.message_id == bindparam('mid'))
+               .order_by(Download.id.desc()).limit(1))
+_GET_BY_MSG_CHAT = (select(Download)
+                    .where(Download.message_id == bindparam('mid'), Download.chat_id == bindparam('cid'))
+                    .order_by(Download.id.desc()).limit(1))
+
+
+@lru_cache(maxsize=None)
+def _progress_update(fields, by_chat):
+    """UPDATE of `fields` (a frozenset of PROGRESS_FIELDS) on a download's
+    latest row, by message_id and optionally chat_id. Built once per shape;
+    there are only a handful, as each downloader writes a fixed field set."""
+    table = Download.__table__
+    latest = select(func.max(table.c.id)).where(table.c.message_id == bindparam('_mid'))
+    if by_chat:
+        latest = latest.where(table.c.chat_id == bindparam('_cid'))
+    return (
+        update(table)
+        .where(table.c.id == latest.scalar_subquery(),
+               # Plain binds rather than an expanding IN, which executemany rejects
+               func.coalesce(table.c.status, '').notin_([literal(s) for s in SETTLED_STATUSES]))
+        .values({f: bindparam(f'_v_{f}') for f in fields})
+    )
+
+
 class DatabaseManager:
     """Database manager for handling all database operations"""
 
     def __init__(self, database_url):
-        self.engine = create_engine(database_url, pool_pre_ping=True)
-        self.Session = scoped_session(sessionmaker(bind=self.engine))
+        self.database_url = database_url
+        self.engine = self._create_engine(database_url)
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+        # key -> value read-through cache for settings; every config lookup
+        # (vps, torrent, telegram api, channels) otherwise hits the DB
+        self._settings_cache = {}
+        # key -> write count; a read only fills the cache if the key's count
+        # is unchanged since before its SELECT, so it can't cache a value
+        # that a concurrent write has already replaced
+        self._settings_versions = {}
+        self._settings_lock = threading.Lock()
+        # ([secured downloaded_from], [secured mapping id]); None until read,
+        # reset whenever download_type_maps changes
+        self._secured_cache = None
+        # ids of users whose must_change_password is known to be cleared
+        self._password_ok_users = set()
+        # (message_id, chat_id) -> buffered progress fields, see flush_progress
+        self._pending_progress = {}
+        self._pending_lock = threading.Lock()
+        # Held for a whole flush, and by immediate writes while they claim
+        # their download's buffered progress, so a flush that already took a
+        # tick can't commit it after the write that supersedes it
+        self._flush_lock = threading.Lock()
+        self._flush_timer = None
+        atexit.register(self.flush_progress)
         Base.metadata.create_all(self.engine)
         self._run_migrations()
 
+    @staticmethod
+    def _create_engine(database_url):
+        """Create the engine with a pool sized for the downloader's concurrent
+        progress writes and API reads."""
+        url = make_url(database_url)
+        if url.get_backend_name() != 'sqlite':
+            driver_args = {}
+            if url.get_driver_name() == 'psycopg2':
+                # INSERTs already batch via insertmanyvalues; this also sends
+                # executemany UPDATEs (flush_progress) through execute_batch
+                # instead of one round-trip per row.
+                driver_args = {'executemany_mode': 'values_plus_batch',
+                               'executemany_batch_page_size': 500}
+            return create_engine(
+                url, pool_pre_ping=True, pool_size=20, max_overflow=30,
+                pool_recycle=1800, pool_use_lifo=True,
+                insertmanyvalues_page_size=1000, **driver_args)
+
+        in_memory = url.database in (None, '', ':memory:')
+        engine = create_engine(
+            url, pool_pre_ping=True, insertmanyvalues_page_size=1000,
+            connect_args={'check_same_thread': False, 'timeout': 30},
+            poolclass=StaticPool if in_memory else None)
+
+        @event.listens_for(engine, 'connect')
+        def _sqlite_pragmas(dbapi_connection, _record):
+            # WAL lets progress writes run alongside readers
+            cursor = dbapi_connection.cursor()
+            if not in_memory:
+                cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute('PRAGMA temp_store=MEMORY')
+            cursor.execute('PRAGMA mmap_size=268435456')
+            cursor.close()
+
+        return engine
+
+    def _table_columns(self, conn, table):
+        """Column names of `table` (empty if it doesn't exist), read with a
+        single catalog query instead of full Inspector reflection."""
+        from sqlalchemy import text
+
+        if self.engine.dialect.name == 'sqlite':
+            query = 'SELECT name FROM pragma_table_info(:t)'
+        else:
+            query = ('SELECT column_name FROM information_schema.columns '
+                     'WHERE table_schema = current_schema() AND table_name = :t')
+        return {row[0] for row in conn.execute(text(query), {'t': table})}
+
+    def _column_nullable(self, conn, table, column):
+        """Whether `table.column` accepts NULL, per the live schema."""
+        from sqlalchemy import text
+
+        if self.engine.dialect.name == 'sqlite':
+            query = 'SELECT "notnull" = 0 FROM pragma_table_info(:t) WHERE name = :c'
+        else:
+            query = ("SELECT is_nullable = 'YES' FROM information_schema.columns "
+                     'WHERE table_schema = current_schema() AND table_name = :t AND column_name = :c')
+        return bool(conn.execute(text(query), {'t': table, 'c': column}).scalar())
+
+    def _table_indexes(self, conn, table):
+        """Index names defined on `table`."""
+        from sqlalchemy import text
+
+        if self.engine.dialect.name == 'sqlite':
+            query = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t"
+        else:
+            query = 'SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :t'
+        return {row[0] for row in conn.execute(text(query), {'t': table})}
+
     def _run_migrations(self):
         """Run any pending database migrations"""
-        from sqlalchemy import text, inspect
-
-        inspector = inspect(self.engine)
-        columns = [c['name'] for c in inspector.get_columns('downloads')]
+        from sqlalchemy import text
 
         with self.engine.connect() as conn:
+            columns = self._table_columns(conn, 'downloads')
+
             # Add file_deleted column if it doesn't exist
             if 'file_deleted' not in columns:
-                conn.execute(text('ALTER TABLE downloads ADD COLUMN file_deleted BOOLEAN DEFAULT FALSE'))
+                conn.execute(text('ALTER TABLE downloads ADD COLUMN file_deleted BOOLEAN NOT NULL DEFAULT FALSE'))
+                conn.commit()
+            elif self._column_nullable(conn, 'downloads', 'file_deleted'):
+                # Rows written before the column had a default may hold NULL;
+                # normalise them, then (Postgres) enforce NOT NULL so this
+                # runs once. SQLite can't add the constraint in place, so a
+                # legacy SQLite table repeats the backfill on each start.
+                conn.execute(text('UPDATE downloads SET file_deleted = FALSE WHERE file_deleted IS NULL'))
+                if self.engine.dialect.name != 'sqlite':
+                    conn.execute(text('ALTER TABLE downloads ALTER COLUMN file_deleted SET DEFAULT FALSE'))
+                    conn.execute(text('ALTER TABLE downloads ALTER COLUMN file_deleted SET NOT NULL'))
                 conn.commit()
 
             # Add author column if it doesn't exist
@@ -249,8 +483,8 @@ class DatabaseManager:
                 conn.commit()
 
             # Users: roles + Telegram identity (bot interaction tracking)
-            if inspector.has_table('users'):
-                user_columns = [c['name'] for c in inspector.get_columns('users')]
+            user_columns = self._table_columns(conn, 'users')
+            if user_columns:
                 if 'role' not in user_columns:
                     conn.execute(text("ALTER TABLE users ADD COLUMN role VARCHAR(20) DEFAULT 'user'"))
                     # Existing web-login users keep full access
@@ -263,13 +497,20 @@ class DatabaseManager:
                 if 'display_name' not in user_columns:
                     conn.execute(text('ALTER TABLE users ADD COLUMN display_name VARCHAR(200)'))
                     conn.commit()
+                if self.engine.dialect.name != 'sqlite' and (conn.execute(text(
+                        'SELECT character_maximum_length FROM information_schema.columns '
+                        "WHERE table_schema = current_schema() AND table_name = 'users' "
+                        "AND column_name = 'password_hash'")).scalar() or 255) < 255:
+                    # scrypt hashes don't fit the old VARCHAR(64)
+                    conn.execute(text('ALTER TABLE users ALTER COLUMN password_hash TYPE VARCHAR(255)'))
+                    conn.commit()
                 if 'must_change_password' not in user_columns:
                     conn.execute(text('ALTER TABLE users ADD COLUMN must_change_password BOOLEAN DEFAULT FALSE'))
                     # Existing installs still on the default 'admin' password
                     # must pick a real one on next login.
                     conn.execute(
                         text('UPDATE users SET must_change_password = TRUE WHERE password_hash = :h'),
-                        {'h': User.hash_password('admin')})
+                        {'h': User.legacy_hash('admin')})
                     conn.commit()
 
             # Migrate is_deleted boolean to deleted_at timestamp
@@ -285,11 +526,18 @@ class DatabaseManager:
                 conn.execute(text('ALTER TABLE downloads ADD COLUMN deleted_at TIMESTAMP'))
                 conn.commit()
 
+            # Indexes declared on Download after the table was first created
+            existing_indexes = self._table_indexes(conn, 'downloads')
+            for index in Download.__table__.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    conn.commit()
+
             # Migrate vps_watch_folders: add auto_sync + connection + per-folder
             # spec columns, drop the legacy unique-on-path constraint (same path
             # can exist on different hosts).
-            if inspector.has_table('vps_watch_folders'):
-                vps_columns = [c['name'] for c in inspector.get_columns('vps_watch_folders')]
+            vps_columns = self._table_columns(conn, 'vps_watch_folders')
+            if vps_columns:
                 if 'auto_sync' not in vps_columns:
                     conn.execute(text('ALTER TABLE vps_watch_folders ADD COLUMN auto_sync BOOLEAN DEFAULT FALSE'))
                     conn.commit()
@@ -320,30 +568,28 @@ class DatabaseManager:
     def _migrate_bot_queries(self):
         """Move queries stored in the legacy 'bot_queries' settings key into
         the bot_queries table. Idempotent: the setting is removed after."""
-        session = self.get_session()
-        try:
-            setting = session.query(Settings).filter_by(key='bot_queries').first()
-            if not setting:
-                return
+        with self.session_scope() as session:
             try:
-                queries = json.loads(setting.value or '[]')
+                setting = session.query(Settings).filter_by(key='bot_queries').first()
+                if not setting:
+                    return
+                try:
+                    queries = json.loads(setting.value or '[]')
+                except Exception:
+                    queries = []
+                existing = {q.key for q in session.query(BotQuery).all()}
+                for q in queries:
+                    key = (q.get('key') or '').strip().lower()
+                    if key and key not in existing:
+                        session.add(BotQuery(key=key, command=q.get('command') or ''))
+                session.delete(setting)
+                # Mark as seeded so defaults aren't re-added if all are deleted
+                if not session.query(Settings).filter_by(key='bot_queries_seeded').first():
+                    session.add(Settings(key='bot_queries_seeded', value='1'))
+                session.commit()
+                print(f"Migrated {len(queries)} bot queries to the bot_queries table")
             except Exception:
-                queries = []
-            existing = {q.key for q in session.query(BotQuery).all()}
-            for q in queries:
-                key = (q.get('key') or '').strip().lower()
-                if key and key not in existing:
-                    session.add(BotQuery(key=key, command=q.get('command') or ''))
-            session.delete(setting)
-            # Mark as seeded so defaults aren't re-added if all are deleted
-            if not session.query(Settings).filter_by(key='bot_queries_seeded').first():
-                session.add(Settings(key='bot_queries_seeded', value='1'))
-            session.commit()
-            print(f"Migrated {len(queries)} bot queries to the bot_queries table")
-        except Exception:
-            session.rollback()
-        finally:
-            self.close_session()
+                session.rollback()
 
     def _migrate_labels_to_specs(self):
         """Copy label bindings back into download_type_maps (source-wide) and
@@ -354,56 +600,57 @@ class DatabaseManager:
         inspector = inspect(self.engine)
         if not inspector.has_table('labels') or not inspector.has_table('source_labels'):
             return
-        session = self.get_session()
+        with self.session_scope() as session:
+            try:
+                if session.query(Settings).filter_by(key='labels_to_specs_migrated').first():
+                    return
+                # Source-wide defaults -> download_type_maps
+                rows = session.execute(text(
+                    "SELECT sl.source, l.folder, l.quality, l.is_hidden FROM source_labels sl "
+                    "JOIN labels l ON l.id = sl.label_id WHERE sl.path IS NULL")).fetchall()
+                for source, folder, quality, is_hidden in rows:
+                    mapping = session.query(DownloadTypeMap).filter_by(downloaded_from=source).first()
+                    if mapping:
+                        mapping.folder = folder
+                        mapping.quality = quality
+                        mapping.is_secured = bool(is_hidden)
+                    else:
+                        session.add(DownloadTypeMap(
+                            downloaded_from=source, folder=folder,
+                            quality=quality, is_secured=bool(is_hidden)))
+                # Per-VPS-folder overrides -> vps_watch_folders specs
+                rows = session.execute(text(
+                    "SELECT sl.path, l.folder, l.is_hidden FROM source_labels sl "
+                    "JOIN labels l ON l.id = sl.label_id WHERE sl.source = 'vps' AND sl.path IS NOT NULL")).fetchall()
+                for path, folder, is_hidden in rows:
+                    session.query(VpsWatchFolder).filter_by(path=path).update(
+                        {VpsWatchFolder.folder: folder, VpsWatchFolder.is_secured: bool(is_hidden)},
+                        synchronize_session=False)
+                session.add(Settings(key='labels_to_specs_migrated', value='1'))
+                session.commit()
+            except Exception:
+                session.rollback()
+
+    @contextmanager
+    def session_scope(self):
+        """Yield a short-lived session, rolling back on error and always
+        closing it. Writers commit explicitly; since objects aren't expired
+        on commit, to_dict() afterwards doesn't re-SELECT the row."""
+        session = self.Session()
         try:
-            if session.query(Settings).filter_by(key='labels_to_specs_migrated').first():
-                return
-            # Source-wide defaults -> download_type_maps
-            rows = session.execute(text(
-                "SELECT sl.source, l.folder, l.quality, l.is_hidden FROM source_labels sl "
-                "JOIN labels l ON l.id = sl.label_id WHERE sl.path IS NULL")).fetchall()
-            for source, folder, quality, is_hidden in rows:
-                mapping = session.query(DownloadTypeMap).filter_by(downloaded_from=source).first()
-                if mapping:
-                    mapping.folder = folder
-                    mapping.quality = quality
-                    mapping.is_secured = bool(is_hidden)
-                    mapping.updated_at = datetime.utcnow()
-                else:
-                    session.add(DownloadTypeMap(
-                        downloaded_from=source, folder=folder,
-                        quality=quality, is_secured=bool(is_hidden)))
-            # Per-VPS-folder overrides -> vps_watch_folders specs
-            rows = session.execute(text(
-                "SELECT sl.path, l.folder, l.is_hidden FROM source_labels sl "
-                "JOIN labels l ON l.id = sl.label_id WHERE sl.source = 'vps' AND sl.path IS NOT NULL")).fetchall()
-            for path, folder, is_hidden in rows:
-                session.query(VpsWatchFolder).filter_by(path=path).update(
-                    {VpsWatchFolder.folder: folder, VpsWatchFolder.is_secured: bool(is_hidden)},
-                    synchronize_session=False)
-            session.add(Settings(key='labels_to_specs_migrated', value='1'))
-            session.commit()
+            yield session
         except Exception:
             session.rollback()
+            raise
         finally:
-            self.close_session()
-
-    def get_session(self):
-        """Get a new database session"""
-        return self.Session()
-
-    def close_session(self):
-        """Close the current session"""
-        self.Session.remove()
+            session.close()
 
     def add_download(self, file, status='downloading', progress=0, speed=0,
                      error=None, downloaded_bytes=0, total_bytes=0, pending_time=None,
                      message_id=None, downloaded_from='telegram', url=None, author=None,
                      chat_id=None):
         """Add a new download entry"""
-        session = self.get_session()
-        try:
-            now = datetime.utcnow()
+        with self.session_scope() as session:
             # Convert message_id to string if it's an int (for Telegram IDs)
             msg_id = str(message_id) if message_id is not None else generate_uuid()
             download = Download(
@@ -413,8 +660,6 @@ class DatabaseManager:
                 progress=progress,
                 speed=speed,
                 error=error,
-                updated_at=now,
-                created_at=now,
                 downloaded_bytes=downloaded_bytes,
                 total_bytes=total_bytes,
                 pending_time=pending_time,
@@ -426,13 +671,33 @@ class DatabaseManager:
             session.add(download)
             session.commit()
             return download.to_dict()
-        finally:
-            self.close_session()
+
+    def add_downloads_bulk(self, rows):
+        """Insert many download entries with one multi-row INSERT.
+
+        Each row is a dict of Download columns (as for add_download);
+        message_id defaults to a fresh UUID and timestamps to now. Skips the
+        ORM unit of work, so nothing is returned but the row count."""
+        if not rows:
+            return 0
+        fresh = iter(generate_uuids(sum(1 for r in rows if r.get('message_id') is None)))
+        rows = [
+            {**r, 'message_id': str(r['message_id']) if r.get('message_id') is not None else next(fresh)}
+            for r in rows
+        ]
+        # executemany needs a uniform column set, so group rows by their keys
+        groups = {}
+        for r in rows:
+            groups.setdefault(frozenset(r), []).append(r)
+        with self.session_scope() as session:
+            for group in groups.values():
+                session.execute(insert(Download.__table__), group)
+            session.commit()
+        return len(rows)
 
     def update_download(self, file, **kwargs):
         """Update a download entry by filename"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             download = session.query(Download).filter_by(file=file).first()
             if download:
                 for key, value in kwargs.items():
@@ -441,13 +706,10 @@ class DatabaseManager:
                 session.commit()
                 return download.to_dict()
             return None
-        finally:
-            self.close_session()
 
     def update_download_by_id(self, download_id, **kwargs):
         """Update a download entry by ID"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             download = session.query(Download).filter_by(id=download_id).first()
             if download:
                 for key, value in kwargs.items():
@@ -456,17 +718,23 @@ class DatabaseManager:
                 session.commit()
                 return download.to_dict()
             return None
-        finally:
-            self.close_session()
 
     def update_download_by_message_id(self, message_id, chat_id=None, **kwargs):
         """Update a download entry by message ID (string UUID or Telegram ID).
 
         Telegram message IDs are only unique per chat, so an optional chat_id
-        narrows the match; without it the most recent record wins."""
-        session = self.get_session()
-        try:
-            msg_id = str(message_id) if message_id is not None else None
+        narrows the match; without it the most recent record wins.
+
+        Pure progress ticks (only PROGRESS_FIELDS) are buffered and written in
+        one batch every PROGRESS_FLUSH_INTERVAL seconds; they return None.
+        Any other update is written immediately, folding in buffered
+        progress for the same download, and returns the updated dict."""
+        msg_id = str(message_id) if message_id is not None else None
+        kwargs = self._buffer_or_merge_progress(msg_id, chat_id, kwargs)
+        if kwargs is None:
+            return None
+
+        with self.session_scope() as session:
             query = session.query(Download).filter_by(message_id=msg_id)
             if chat_id is not None:
                 query = query.filter_by(chat_id=chat_id)
@@ -475,193 +743,353 @@ class DatabaseManager:
                 for key, value in kwargs.items():
                     if hasattr(download, key):
                         setattr(download, key, value)
-                session.commit()
+                if session.is_modified(download):
+                    session.commit()
                 return download.to_dict()
             return None
-        finally:
-            self.close_session()
+
+    def patch_download_by_message_id(self, message_id, chat_id=None, **kwargs):
+        """Like update_download_by_message_id, but for callers that don't need
+        the row back: a single UPDATE without loading the row first.
+        Returns the number of rows changed (None when only buffered)."""
+        msg_id = str(message_id) if message_id is not None else None
+        kwargs = self._buffer_or_merge_progress(msg_id, chat_id, kwargs)
+        if kwargs is None:
+            return None
+        latest = select(func.max(Download.id)).where(Download.message_id == msg_id)
+        if chat_id is not None:
+            latest = latest.where(Download.chat_id == chat_id)
+        return self._patch_download(Download.id == latest.scalar_subquery(), kwargs)
+
+    def _patch_download(self, predicate, fields):
+        """UPDATE downloads SET fields WHERE predicate; returns the rowcount.
+        Unknown field names are ignored, as in the update_download_* methods.
+        Rows already holding every value are left alone (rowcount 0), so
+        repeated writes of the same state don't bump updated_at or commit."""
+        columns = Download.__table__.c
+        values = {k: v for k, v in fields.items() if k in columns}
+        if not values:
+            return 0
+        changed = or_(*(columns[k].is_distinct_from(v) for k, v in values.items()))
+        with self.session_scope() as session:
+            result = session.execute(update(Download.__table__).where(predicate, changed).values(**values))
+            if not result.rowcount:
+                return 0
+            session.commit()
+            return result.rowcount
+
+    def _buffer_or_merge_progress(self, msg_id, chat_id, fields):
+        """Buffer a progress-only update (returns None), or return the fields
+        merged over any progress still buffered for this download."""
+        key = (msg_id, chat_id)
+        if fields and fields.keys() <= PROGRESS_FIELDS:
+            with self._pending_lock:
+                self._pending_progress.setdefault(key, {}).update(fields)
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(PROGRESS_FLUSH_INTERVAL, self.flush_progress)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+            return None
+        with self._flush_lock, self._pending_lock:
+            pending = self._pending_progress.pop(key, None)
+        return {**pending, **fields} if pending else fields
+
+    def flush_progress(self):
+        """Write all buffered progress ticks: one executemany UPDATE per
+        distinct field set, each targeting the download's latest row. Rows
+        already in a SETTLED_STATUSES state are skipped."""
+        with self._flush_lock:
+            with self._pending_lock:
+                batch, self._pending_progress = self._pending_progress, {}
+                self._flush_timer = None
+            if not batch:
+                return
+
+            groups = {}
+            for (msg_id, chat_id), fields in batch.items():
+                groups.setdefault((frozenset(fields), chat_id is not None), []).append(
+                    {'_mid': msg_id, '_cid': chat_id, **{f'_v_{k}': v for k, v in fields.items()}})
+
+            with self.session_scope() as session:
+                for (fields, by_chat), params in groups.items():
+                    session.execute(_progress_update(fields, by_chat), params)
+                session.commit()
 
     def get_download(self, file):
         """Get a download entry by filename"""
-        session = self.get_session()
-        try:
-            download = session.query(Download).filter_by(file=file).first()
+        with self.session_scope() as session:
+            download = session.execute(_GET_BY_FILE, {'file': file}).scalar()
             return download.to_dict() if download else None
-        finally:
-            self.close_session()
 
     def get_download_by_id(self, download_id):
         """Get a download entry by ID"""
-        session = self.get_session()
-        try:
-            download = session.query(Download).filter_by(id=download_id).first()
+        with self.session_scope() as session:
+            download = session.execute(_GET_BY_ID, {'id': download_id}).scalar()
             return download.to_dict() if download else None
-        finally:
-            self.close_session()
 
     def get_all_downloads(self, include_deleted=False):
         """Get all downloads ordered by updated_at descending"""
-        session = self.get_session()
-        try:
-            query = session.query(Download)
-            if not include_deleted:
-                query = query.filter(Download.deleted_at == None)
-            downloads = query.order_by(Download.updated_at.desc()).all()
-            return [d.to_dict() for d in downloads]
-        finally:
-            self.close_session()
+        return list(self.iter_downloads(include_deleted))
+
+    def iter_downloads(self, include_deleted=False, chunk_size=500):
+        """Yield download dicts in get_all_downloads order, fetching
+        chunk_size rows at a time so single-pass consumers never hold the
+        whole table in memory."""
+        # Plain column select: rows skip ORM instrumentation and the
+        # identity map, which matters for this full-table listing.
+        stmt = select(*Download.__table__.columns)
+        if not include_deleted:
+            stmt = stmt.where(Download.deleted_at == None)
+        stmt = stmt.order_by(Download.updated_at.desc())
+        with self.session_scope() as session:
+            for row in session.execute(stmt.execution_options(yield_per=chunk_size)):
+                yield Download.serialize(row)
+
+    def get_download_summaries(self, include_deleted=False):
+        """Narrow variant of get_all_downloads for stats and aggregates.
+
+        Only reads the small numeric/status columns, leaving the wide text
+        ones (error, url, file_meta) on disk."""
+        stmt = select(Download.id, Download.status, Download.speed, Download.downloaded_bytes,
+                      Download.total_bytes, Download.downloaded_from, Download.author,
+                      Download.created_at)
+        if not include_deleted:
+            stmt = stmt.where(Download.deleted_at == None)
+        with self.session_scope() as session:
+            return [{
+                'id': row.id,
+                'status': row.status,
+                'speed': row.speed,
+                'downloaded_bytes': row.downloaded_bytes,
+                'total_bytes': row.total_bytes,
+                'downloaded_from': row.downloaded_from or 'telegram',
+                'author': row.author,
+                'created_at': f"{row.created_at.isoformat()}Z" if row.created_at else None,
+            } for row in session.execute(stmt)]
+
+    def get_download_stats(self):
+        """Dashboard totals over non-deleted downloads, aggregated by the
+        database in one pass instead of summing every row in Python."""
+        bytes_ = func.coalesce(Download.total_bytes, 0)
+        done = Download.status == 'done'
+        active = Download.status.in_(('downloading', 'paused'))
+        stmt = select(
+            func.coalesce(func.sum(case((done, bytes_), else_=func.coalesce(Download.downloaded_bytes, 0))), 0),
+            func.coalesce(func.sum(bytes_), 0),
+            func.coalesce(func.sum(case((active, bytes_ - func.coalesce(Download.downloaded_bytes, 0)),
+                                        else_=0)), 0),
+            func.coalesce(func.sum(Download.speed), 0),
+            func.count(case((done, 1))),
+            func.count(),
+        ).where(Download.deleted_at == None)
+        with self.session_scope() as session:
+            total_downloaded, total_size, pending_bytes, total_speed, downloaded_count, total_count = \
+                session.execute(stmt).one()
+        return {
+            "total_downloaded": int(total_downloaded),
+            "total_size": int(total_size),
+            "pending_bytes": int(pending_bytes),
+            "total_speed": total_speed,
+            "downloaded_count": downloaded_count,
+            "total_count": total_count,
+            "all_count": total_count,
+            "active_count": total_count - downloaded_count,
+        }
+
+    def get_download_analytics(self, since=None, include_deleted=False):
+        """Download counts and total sizes grouped in SQL by creation hour,
+        source, author and status: (hour, source, author, status, count, size)
+        rows, hour as 'YYYY-MM-DD HH' (UTC). `since` is a naive UTC cutoff."""
+        hour = hour_bucket(Download.created_at)
+        source = func.coalesce(Download.downloaded_from, 'telegram')
+        stmt = (
+            select(hour, source, Download.author, Download.status,
+                   func.count(), func.coalesce(func.sum(Download.total_bytes), 0))
+            .where(Download.created_at != None)
+            .group_by(hour, source, Download.author, Download.status)
+        )
+        if since is not None:
+            stmt = stmt.where(Download.created_at >= since)
+        if not include_deleted:
+            stmt = stmt.where(Download.deleted_at == None)
+        with self.session_scope() as session:
+            return [tuple(row) for row in session.execute(stmt)]
+
+    def get_all_downloads_with_maps(self, include_deleted=False, author=None, active_only=False):
+        """Like get_all_downloads, but LEFT JOINs each row's source mapping.
+
+        Returns (download_dict, mapping) pairs where mapping holds the
+        source's `folder` and `is_secured` (None when unmapped), so callers
+        needn't look mappings up per row. `author` and `active_only` (status
+        isn't 'done') narrow the rows in SQL."""
+        source = func.coalesce(Download.downloaded_from, 'telegram')
+        stmt = (
+            select(*Download.__table__.columns,
+                   DownloadTypeMap.folder.label('map_folder'),
+                   DownloadTypeMap.is_secured.label('map_is_secured'))
+            .select_from(Download)
+            .outerjoin(DownloadTypeMap, DownloadTypeMap.downloaded_from == source)
+        )
+        if not include_deleted:
+            stmt = stmt.where(Download.deleted_at == None)
+        if author:
+            stmt = stmt.where(Download.author == author)
+        if active_only:
+            stmt = stmt.where(Download.status.is_distinct_from('done'))
+        stmt = stmt.order_by(Download.updated_at.desc())
+        with self.session_scope() as session:
+            return [
+                (Download.serialize(row), {'folder': row.map_folder, 'is_secured': row.map_is_secured})
+                for row in session.execute(stmt)
+            ]
 
     def delete_download(self, file):
         """Soft delete a download entry by filename"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             download = session.query(Download).filter_by(file=file).first()
             if download:
-                now = datetime.utcnow()
-                download.deleted_at = now
-                download.updated_at = now
+                download.deleted_at = utcnow()
                 session.commit()
                 return True
             return False
-        finally:
-            self.close_session()
 
     def delete_download_by_id(self, download_id):
         """Soft delete a download entry by ID"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             download = session.query(Download).filter_by(id=download_id).first()
             if download:
-                now = datetime.utcnow()
-                download.deleted_at = now
-                download.updated_at = now
+                download.deleted_at = utcnow()
                 session.commit()
                 return True
             return False
-        finally:
-            self.close_session()
 
     def delete_download_by_message_id(self, message_id):
         """Soft delete a download entry by message ID (string UUID or Telegram ID)"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             msg_id = str(message_id) if message_id is not None else None
             download = session.query(Download).filter_by(message_id=msg_id).first()
             if download:
-                now = datetime.utcnow()
-                download.deleted_at = now
-                download.updated_at = now
+                download.deleted_at = utcnow()
                 session.commit()
                 return True
             return False
-        finally:
-            self.close_session()
 
     def get_download_by_message_id(self, message_id, chat_id=None):
         """Get a download entry by message ID (string UUID or Telegram ID).
 
         Telegram message IDs are only unique per chat, so an optional chat_id
         narrows the match; without it the most recent record wins."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             msg_id = str(message_id) if message_id is not None else None
-            query = session.query(Download).filter_by(message_id=msg_id)
             if chat_id is not None:
-                query = query.filter_by(chat_id=chat_id)
-            download = query.order_by(Download.id.desc()).first()
+                download = session.execute(_GET_BY_MSG_CHAT, {'mid': msg_id, 'cid': chat_id}).scalar()
+            else:
+                download = session.execute(_GET_BY_MSG, {'mid': msg_id}).scalar()
             return download.to_dict() if download else None
-        finally:
-            self.close_session()
 
     def get_setting(self, key):
-        """Get a setting value by key"""
-        session = self.get_session()
-        try:
+        """Get a setting value by key (cached until the key is written)"""
+        with self._settings_lock:
+            if key in self._settings_cache:
+                return self._settings_cache[key]
+            version = self._settings_versions.get(key, 0)
+        with self.session_scope() as session:
             setting = session.query(Settings).filter_by(key=key).first()
-            return setting.value if setting else None
-        finally:
-            self.close_session()
+            value = setting.value if setting else None
+        with self._settings_lock:
+            if self._settings_versions.get(key, 0) == version:
+                self._settings_cache[key] = value
+        return value
+
+    def _invalidate_settings(self, keys):
+        """Drop cached values for `keys` after a committed write to them."""
+        with self._settings_lock:
+            for key in keys:
+                self._settings_versions[key] = self._settings_versions.get(key, 0) + 1
+                self._settings_cache.pop(key, None)
 
     def set_setting(self, key, value):
         """Set a setting value (insert or update)"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             setting = session.query(Settings).filter_by(key=key).first()
             if setting:
                 setting.value = value
-                setting.updated_at = datetime.utcnow()
             else:
                 setting = Settings(key=key, value=value)
                 session.add(setting)
             session.commit()
+            self._invalidate_settings((key,))
             return setting.to_dict()
-        finally:
-            self.close_session()
 
     def delete_setting(self, key):
         """Delete a setting by key. Returns True if a row was removed."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             setting = session.query(Settings).filter_by(key=key).first()
             if not setting:
                 return False
             session.delete(setting)
             session.commit()
+            self._invalidate_settings((key,))
             return True
-        finally:
-            self.close_session()
 
     def get_all_settings(self):
         """Get all settings as a dictionary"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             settings = session.query(Settings).all()
             return {s.key: s.value for s in settings}
-        finally:
-            self.close_session()
 
     def set_multiple_settings(self, settings_dict):
-        """Set multiple settings at once"""
-        session = self.get_session()
-        try:
-            for key, value in settings_dict.items():
-                setting = session.query(Settings).filter_by(key=key).first()
-                if setting:
-                    setting.value = value
-                    setting.updated_at = datetime.utcnow()
+        """Set multiple settings at once (a single UPSERT where supported).
+        Returns the written key/value pairs; the rest of the table isn't
+        re-read (callers wanting everything use get_all_settings)."""
+        if not settings_dict:
+            return {}
+        dialect = self.engine.dialect.name
+        with self.session_scope() as session:
+            if dialect in ('sqlite', 'postgresql'):
+                if dialect == 'sqlite':
+                    from sqlalchemy.dialects.sqlite import insert
                 else:
-                    setting = Settings(key=key, value=value)
-                    session.add(setting)
+                    from sqlalchemy.dialects.postgresql import insert
+                stmt = insert(Settings.__table__).values(
+                    [{'key': k, 'value': v} for k, v in settings_dict.items()])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['key'],
+                    set_={'value': stmt.excluded.value, 'updated_at': utcnow()})
+                session.execute(stmt)
+            else:
+                for key, value in settings_dict.items():
+                    setting = session.query(Settings).filter_by(key=key).first()
+                    if setting:
+                        setting.value = value
+                    else:
+                        session.add(Settings(key=key, value=value))
             session.commit()
-            return self.get_all_settings()
-        finally:
-            self.close_session()
+        self._invalidate_settings(settings_dict)
+        return dict(settings_dict)
 
     # User management methods
     def get_user_by_username(self, username: str):
         """Get a user by username"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             user = session.query(User).filter_by(username=username).first()
             return user
-        finally:
-            self.close_session()
 
     def authenticate_user(self, username: str, password: str):
         """Authenticate a user by username and password"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             user = session.query(User).filter_by(username=username).first()
             if user and user.check_password(password):
+                if user.needs_rehash():
+                    # Upgrade legacy SHA-256 hashes on successful login
+                    user.password_hash = User.hash_password(password)
+                    session.commit()
                 return user.to_dict()
             return None
-        finally:
-            self.close_session()
 
     def create_user(self, username: str, password: str):
         """Create a new user"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             existing = session.query(User).filter_by(username=username).first()
             if existing:
                 return None  # User already exists
@@ -672,13 +1100,10 @@ class DatabaseManager:
             session.add(user)
             session.commit()
             return user.to_dict()
-        finally:
-            self.close_session()
 
     def update_user_password(self, user_id: int, current_password: str, new_password: str):
         """Update user password after verifying current password"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             user = session.query(User).filter_by(id=user_id).first()
             if not user:
                 return {'error': 'User not found'}
@@ -688,24 +1113,26 @@ class DatabaseManager:
             user.must_change_password = False  # forced change satisfied
             session.commit()
             return {'success': True}
-        finally:
-            self.close_session()
 
     def user_must_change_password(self, user_id: int) -> bool:
-        """Whether the user is required to set a new password before using the app."""
-        session = self.get_session()
-        try:
-            user = session.query(User).filter_by(id=user_id).first()
-            return bool(user and user.must_change_password)
-        finally:
-            self.close_session()
+        """Whether the user is required to set a new password before using the app.
+
+        Checked on every authenticated request. The flag only ever goes from
+        set to cleared at runtime, so users seen with it cleared are
+        remembered and answered without a query."""
+        if user_id in self._password_ok_users:
+            return False
+        with self.session_scope() as session:
+            flag = session.query(User.must_change_password).filter_by(id=user_id).scalar()
+        if flag is not None and not flag:
+            self._password_ok_users.add(user_id)
+        return bool(flag)
 
     def seed_default_user(self):
         """Create default user if no users exist"""
-        session = self.get_session()
-        try:
-            user_count = session.query(User).count()
-            if user_count == 0:
+        with self.session_scope() as session:
+            has_user = session.query(User.id).limit(1).first() is not None
+            if not has_user:
                 user = User(
                     username='admin',
                     password_hash=User.hash_password('admin'),
@@ -715,14 +1142,11 @@ class DatabaseManager:
                 session.add(user)
                 session.commit()
                 print("Default user 'admin' created (password change required on first login)")
-        finally:
-            self.close_session()
 
     def upsert_telegram_user(self, telegram_id: int, username: str = None, display_name: str = None):
         """Register (or refresh) a Telegram user who interacted with the bot.
         New users get the 'user' role; promote to admin in Settings -> Users."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             user = session.query(User).filter_by(telegram_id=telegram_id).first()
             if user:
                 if display_name and user.display_name != display_name:
@@ -742,52 +1166,37 @@ class DatabaseManager:
             session.add(user)
             session.commit()
             return user.to_dict()
-        finally:
-            self.close_session()
 
     def get_users(self):
         """All users (web + Telegram) for the management UI."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             return [u.to_dict() for u in session.query(User).order_by(User.id).all()]
-        finally:
-            self.close_session()
 
     def get_telegram_user_role(self, telegram_id: int):
         """Role of a Telegram user, or None if unknown."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             user = session.query(User).filter_by(telegram_id=telegram_id).first()
             return (user.role or 'user') if user else None
-        finally:
-            self.close_session()
 
     def update_user_role(self, user_id: int, role: str):
         """Change a user's role. Returns the updated dict or None."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             user = session.query(User).filter_by(id=user_id).first()
             if not user:
                 return None
             user.role = role
             session.commit()
             return user.to_dict()
-        finally:
-            self.close_session()
 
     # Bot query methods
     def get_bot_queries(self):
         """All bot queries ordered by key."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             return [q.to_dict() for q in session.query(BotQuery).order_by(BotQuery.key).all()]
-        finally:
-            self.close_session()
 
     def upsert_bot_query(self, key: str, command: str, original_key: str = None):
         """Create or update a query. original_key supports renames."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             key = key.strip().lower()
             query = None
             if original_key:
@@ -802,69 +1211,55 @@ class DatabaseManager:
                     session.delete(clash)
                 query.key = key
                 query.command = command
-                query.updated_at = datetime.utcnow()
             else:
                 query = BotQuery(key=key, command=command)
                 session.add(query)
             session.commit()
             return query.to_dict()
-        finally:
-            self.close_session()
 
     def delete_bot_query(self, key: str):
         """Delete a query by key. Returns True if a row was removed."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             query = session.query(BotQuery).filter_by(key=key.strip().lower()).first()
             if not query:
                 return False
             session.delete(query)
             session.commit()
             return True
-        finally:
-            self.close_session()
 
     # Download type map methods
     def get_all_download_type_maps(self):
         """Get all download type mappings"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             maps = session.query(DownloadTypeMap).order_by(DownloadTypeMap.downloaded_from).all()
             return [m.to_dict() for m in maps]
-        finally:
-            self.close_session()
 
     def get_download_type_map(self, downloaded_from: str):
         """Get a download type mapping by downloaded_from value"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             mapping = session.query(DownloadTypeMap).filter_by(downloaded_from=downloaded_from).first()
             return mapping.to_dict() if mapping else None
-        finally:
-            self.close_session()
+
+    def _secured_maps(self):
+        """Cached (sources, ids) of secured mappings."""
+        cached = self._secured_cache
+        if cached is None:
+            with self.session_scope() as session:
+                rows = session.query(DownloadTypeMap.downloaded_from, DownloadTypeMap.id).filter_by(is_secured=True).all()
+            cached = self._secured_cache = ([r.downloaded_from for r in rows], [r.id for r in rows])
+        return cached
 
     def get_secured_sources(self):
         """Get list of downloaded_from values that are secured"""
-        session = self.get_session()
-        try:
-            maps = session.query(DownloadTypeMap).filter_by(is_secured=True).all()
-            return [m.downloaded_from for m in maps]
-        finally:
-            self.close_session()
+        return list(self._secured_maps()[0])
 
     def get_secured_mapping_ids(self):
         """Get list of mapping IDs that are secured"""
-        session = self.get_session()
-        try:
-            maps = session.query(DownloadTypeMap).filter_by(is_secured=True).all()
-            return [m.id for m in maps]
-        finally:
-            self.close_session()
+        return list(self._secured_maps()[1])
 
     def add_download_type_map(self, downloaded_from: str, is_secured: bool = False, folder: str = None, quality: str = None):
         """Add a new download type mapping"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             existing = session.query(DownloadTypeMap).filter_by(downloaded_from=downloaded_from).first()
             if existing:
                 return {'error': 'Mapping already exists for this source'}
@@ -876,54 +1271,44 @@ class DatabaseManager:
             )
             session.add(mapping)
             session.commit()
+            self._secured_cache = None
             return mapping.to_dict()
-        finally:
-            self.close_session()
 
     def update_download_type_map(self, map_id: int, **kwargs):
         """Update a download type mapping"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             mapping = session.query(DownloadTypeMap).filter_by(id=map_id).first()
             if not mapping:
                 return {'error': 'Mapping not found'}
             for key, value in kwargs.items():
                 if hasattr(mapping, key) and key != 'id':
                     setattr(mapping, key, value)
-            mapping.updated_at = datetime.utcnow()
             session.commit()
+            self._secured_cache = None
             return mapping.to_dict()
-        finally:
-            self.close_session()
 
     def delete_download_type_map(self, map_id: int):
         """Delete a download type mapping"""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             mapping = session.query(DownloadTypeMap).filter_by(id=map_id).first()
             if not mapping:
                 return False
             session.delete(mapping)
             session.commit()
+            self._secured_cache = None
             return True
-        finally:
-            self.close_session()
 
     # --- VPS watch folders ---
     def get_vps_watch_folders(self):
         """Return all watched VPS folders, ordered by path."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             folders = session.query(VpsWatchFolder).order_by(VpsWatchFolder.path).all()
             return [f.to_dict() for f in folders]
-        finally:
-            self.close_session()
 
     def add_vps_watch_folder(self, path: str, host: str = None, port: int = 22, username: str = None):
         """Add a watched folder tied to a VPS connection. Returns its dict,
         or the existing one if the same path already exists for that connection."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             existing = session.query(VpsWatchFolder).filter_by(
                 path=path, host=host, username=username
             ).first()
@@ -933,26 +1318,20 @@ class DatabaseManager:
             session.add(folder)
             session.commit()
             return folder.to_dict()
-        finally:
-            self.close_session()
 
     def delete_vps_watch_folder(self, folder_id: int):
         """Delete a watched folder by id. Returns True if deleted."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             folder = session.query(VpsWatchFolder).filter_by(id=folder_id).first()
             if not folder:
                 return False
             session.delete(folder)
             session.commit()
             return True
-        finally:
-            self.close_session()
 
     def set_vps_watch_folder_connection(self, folder_id: int, host, port, username):
         """Backfill the VPS connection on a watched folder (for legacy rows)."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             folder = session.query(VpsWatchFolder).filter_by(id=folder_id).first()
             if not folder:
                 return None
@@ -961,14 +1340,11 @@ class DatabaseManager:
             folder.username = username
             session.commit()
             return folder.to_dict()
-        finally:
-            self.close_session()
 
     def update_vps_watch_folder(self, folder_id: int, **kwargs):
         """Update a watched folder's specs (auto_sync, folder, is_secured).
         Returns its dict, or None if missing."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             folder = session.query(VpsWatchFolder).filter_by(id=folder_id).first()
             if not folder:
                 return None
@@ -980,15 +1356,12 @@ class DatabaseManager:
                 folder.is_secured = bool(kwargs['is_secured'])
             session.commit()
             return folder.to_dict()
-        finally:
-            self.close_session()
 
     def get_vps_watch_folder_for_path(self, path: str):
         """The watched folder containing `path` (longest prefix match), or None."""
         if not path:
             return None
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             best, best_len = None, -1
             for f in session.query(VpsWatchFolder).all():
                 base = (f.path or '').rstrip('/')
@@ -998,30 +1371,29 @@ class DatabaseManager:
                     if len(base) > best_len:
                         best_len, best = len(base), f
             return best.to_dict() if best else None
-        finally:
-            self.close_session()
 
     def vps_download_exists(self, remote_path: str) -> bool:
         """Whether a non-deleted VPS download already exists for this remote path."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             return session.query(Download).filter_by(
                 downloaded_from='vps', url=remote_path, deleted_at=None
             ).first() is not None
-        finally:
-            self.close_session()
 
 
 # Global database manager instance (initialized in config)
 db_manager = None
+_init_lock = threading.Lock()
 
 
 def init_database(database_url):
-    """Initialize the database manager"""
+    """Initialize the database manager. Repeat calls for the same URL return
+    the existing manager instead of re-running create_all and migrations."""
     global db_manager
-    db_manager = DatabaseManager(database_url)
-    db_manager.seed_default_user()
-    return db_manager
+    with _init_lock:
+        if db_manager is None or db_manager.database_url != database_url:
+            db_manager = DatabaseManager(database_url)
+            db_manager.seed_default_user()
+        return db_manager
 
 
 def get_db():
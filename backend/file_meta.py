@@ -14,6 +14,7 @@ from pathlib import Path
 
 from backend.config import DOWNLOAD_DIR, SCREENSHOTS_DIR
 from backend.database import get_db
+from backend.task_registry import get_download_tasks
 
 logger = logging.getLogger(__name__)
 
@@ -165,7 +166,7 @@ async def extract_and_store_meta(message_id) -> bool:
     if not meta.get('video'):
         return False
 
-    db.update_download_by_message_id(message_id, file_meta=json.dumps(meta))
+    db.patch_download_by_message_id(message_id, file_meta=json.dumps(meta))
     res = f"{meta['video']['width']}x{meta['video']['height']}"
     logger.info("Stored metadata [%s] for %s", res, filename)
 
@@ -314,7 +315,10 @@ async def poll_and_extract_meta(message_id):
     if not meta_stored:
         return
 
-    # Phase 3: wait for download to complete, then generate thumbnails
+    # Phase 3: wait for download to complete, then generate thumbnails.
+    # While the download's task is registered, sleep until it exits rather
+    # than re-reading its row; the poll then settles the final status.
+    await get_download_tasks().wait_removed(message_id)
     download = await _poll_download(db, msg_id, ready_fn=lambda d: d.get('status') == 'done')
     if not download:
         return
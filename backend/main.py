@@ -2,10 +2,14 @@
 Main entry point for DownLee
 """
 import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
 import threading
 from backend.config import LOG_FILE, DATABASE_URL
 from backend.database import init_database
+from backend.task_registry import get_download_tasks
 from backend.telegram_handler import TelegramDownloader
 from backend.ytdlp_handler import YtdlpDownloader
 from backend.vps_handler import VpsDownloader
@@ -13,35 +17,45 @@ from backend.web_app import WebApp
 
 
 def setup_logging():
-    """Setup logging configuration"""
-    logging.basicConfig(
-        filename=str(LOG_FILE),
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s"
-    )
-
-
-def validate_credentials():
-    """Warn about missing Telegram credentials in .env (non-fatal).
-
-    API credentials and monitored channels can all be configured from the
-    web UI (Settings -> Telegram) and are stored in the database; .env
-    values only act as fallback/seed."""
-    from backend.config import API_ID, API_HASH
-
-    warnings = []
-
-    if not API_ID or API_ID == 0:
-        warnings.append("API_ID is not set in .env file")
+    """Setup logging configuration.
+
+    Records are handed to a queue and written to LOG_FILE by a listener
+    thread, so logging from the downloader, event loop and Flask threads
+    never blocks on the file."""
+    file_handler = logging.FileHandler(str(LOG_FILE))
+    file_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    # The queue side only renders the message; the listener's handler
+    # applies the real format
+    logging.basicConfig(level=logging.INFO, format="%(message)s",
+                        handlers=[logging.handlers.QueueHandler(log_queue)])
+
+
+def install_uvloop():
+    """Use uvloop's libuv-based event loops when available (Linux/macOS);
+    otherwise keep the stdlib loop."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
 
-    if not API_HASH or API_HASH == 'your_api_hash_here':
-        warnings.append("API_HASH is not set in .env file")
 
-    if warnings:
-        print("⚠️  Telegram credentials missing from .env (can be set in the web UI instead):")
-        for warning in warnings:
-            print(f"   - {warning}")
+def validate_credentials(telegram_downloader):
+    """Warn when no Telegram API credentials are configured (non-fatal).
 
+    Uses the credentials the downloader actually resolved (database setting
+    first, .env as fallback), so there is one source of truth and a DB-only
+    setup doesn't get a spurious .env warning. API credentials and monitored
+    channels can all be configured from the web UI (Settings -> Telegram)."""
+    if telegram_downloader.api_source:
+        print(f"🔑 Telegram API credentials loaded from {telegram_downloader.api_source}")
+        return True
+    print("⚠️  Telegram API credentials not configured (set them in the web UI or .env)")
     return True
 
 
@@ -54,18 +68,19 @@ def main():
     print("📊 Initializing database...")
     init_database(DATABASE_URL)
 
-    # Validate credentials
-    if not validate_credentials():
-        return
-
     # Shared download state
-    download_tasks = {}  # key: message_id, value: asyncio.Task
+    download_tasks = get_download_tasks()  # key: message_id, value: asyncio.Task/Future/Thread
 
-    # Create event loop for async operations
+    # Create event loop for async operations. The policy also covers the
+    # loop the Telegram client creates on the main thread.
+    if install_uvloop():
+        print("⚡ Using uvloop event loop")
     loop = asyncio.new_event_loop()
 
     # Initialize components
     telegram_downloader = TelegramDownloader(download_tasks)
+    if not validate_credentials(telegram_downloader):
+        return
     ytdlp_downloader = YtdlpDownloader(download_tasks)
     vps_downloader = VpsDownloader(download_tasks, loop)
     web_app = WebApp(download_tasks, ytdlp_downloader, loop, telegram_downloader, vps_downloader)
@@ -75,17 +90,19 @@ def main():
     flask_thread.start()
 
     # Run event loop in a separate thread for yt-dlp async operations
+    loop_ready = threading.Event()
+
     def run_loop():
         asyncio.set_event_loop(loop)
         print("🔄 Event loop starting...")
+        loop.call_soon(loop_ready.set)  # first callback once run_forever is up
         loop.run_forever()
 
     loop_thread = threading.Thread(target=run_loop, daemon=True)
     loop_thread.start()
 
-    # Give the loop thread a moment to start
-    import time
-    time.sleep(0.5)
+    # Wait until the loop thread is actually running
+    loop_ready.wait(timeout=5)
 
     print("🎬 yt-dlp downloader ready")
     print(f"   Event loop running: {loop.is_running()}")
@@ -1,6 +1,9 @@
 """
 Prometheus metrics module for DownLee
 """
+import gzip
+import threading
+import time
 from prometheus_client import Counter, Gauge, Histogram, Info, generate_latest, CONTENT_TYPE_LATEST
 
 # Application info
@@ -110,9 +113,33 @@ db_downloads_by_author = Gauge(
 )
 
 
-def get_metrics():
-    """Generate Prometheus metrics output"""
-    return generate_latest()
+METRICS_CACHE_TTL = 4.0  # seconds; keep below the Prometheus scrape interval
+
+# (monotonic time, plain text, gzipped text) of the last render
+_rendered = (float('-inf'), b'', b'')
+_render_lock = threading.Lock()
+
+
+def get_metrics(accept_encoding: str = '', refresh=None):
+    """Generate Prometheus metrics output as (body, content_encoding).
+
+    The exposition text is rendered (and gzipped once) at most every
+    METRICS_CACHE_TTL seconds; scrapes in between get the cached bytes.
+    `refresh` is called just before a new render, to update gauges derived
+    from elsewhere (the database). The body is gzipped when the client
+    accepts it, and content_encoding is then 'gzip' (else None)."""
+    global _rendered
+    with _render_lock:
+        if time.monotonic() - _rendered[0] >= METRICS_CACHE_TTL:
+            if refresh is not None:
+                refresh()
+            _flush_counters()
+            raw = generate_latest()
+            _rendered = (time.monotonic(), raw, gzip.compress(raw, compresslevel=1))
+        _, raw, gzipped = _rendered
+    if 'gzip' in (accept_encoding or ''):
+        return gzipped, 'gzip'
+    return raw, None
 
 
 def get_content_type():
@@ -122,38 +149,73 @@ def get_content_type():
 
 # Helper functions for updating metrics
 
+# (metric, label values) -> bound child. metric.labels() takes the metric's
+# lock and rebuilds the key on every call; the children never change, so
+# bind each combination once.
+_children = {}
+
+
+def _child(metric, *label_values):
+    """Labelled child of `metric`, label values given in declaration order."""
+    key = (metric, label_values)
+    child = _children.get(key)
+    if child is None:
+        child = _children.setdefault(key, metric.labels(*label_values))
+    return child
+
+
+# counter child -> increment not yet applied. Counters only matter when
+# scraped, so bursts of increments (retry storms, many completions) are
+# summed here and applied once per render by _flush_counters().
+_pending_incs = {}
+_pending_lock = threading.Lock()
+
+
+def _inc_later(child, amount=1):
+    with _pending_lock:
+        _pending_incs[child] = _pending_incs.get(child, 0) + amount
+
+
+def _flush_counters():
+    global _pending_incs
+    with _pending_lock:
+        pending, _pending_incs = _pending_incs, {}
+    for child, amount in pending.items():
+        child.inc(amount)
+
+
 def record_download_started(source: str):
     """Record a new download started"""
-    downloads_started.labels(source=source).inc()
-    downloads_in_progress.labels(source=source).inc()
+    _child(downloads_started, source).inc()
+    _child(downloads_in_progress, source).inc()
 
 
 def record_download_completed(source: str, size_bytes: int, duration_seconds: float):
     """Record a completed download"""
-    downloads_total.labels(source=source, status='done').inc()
-    downloads_in_progress.labels(source=source).dec()
-    bytes_downloaded_total.labels(source=source).inc(size_bytes)
-    download_size_bytes.labels(source=source).observe(size_bytes)
+    _child(downloads_total, source, 'done').inc()
+    _child(downloads_in_progress, source).dec()
+    _inc_later(_child(bytes_downloaded_total, source), size_bytes)
+    _child(download_size_bytes, source).observe(size_bytes)
     if duration_seconds > 0:
-        download_duration_seconds.labels(source=source).observe(duration_seconds)
+        _child(download_duration_seconds, source).observe(duration_seconds)
 
 
 def record_download_failed(source: str, error_type: str = 'unknown'):
     """Record a failed download"""
-    downloads_total.labels(source=source, status='failed').inc()
-    downloads_in_progress.labels(source=source).dec()
-    download_errors_total.labels(source=source, error_type=error_type).inc()
+    _child(downloads_total, source, 'failed').inc()
+    _child(downloads_in_progress, source).dec()
+    _child(download_errors_total, source, error_type).inc()
 
 
 def record_download_stopped(source: str):
     """Record a stopped/cancelled download"""
-    downloads_total.labels(source=source, status='stopped').inc()
-    downloads_in_progress.labels(source=source).dec()
+    _child(downloads_total, source, 'stopped').inc()
+    _child(downloads_in_progress, source).dec()
 
 
 def record_retry(source: str):
     """Record a download retry"""
-    download_retries_total.labels(source=source).inc()
+    _inc_later(_child(download_retries_total, source))
 
 
 def update_speed(total_speed_kb: float, speed_by_source: dict = None):
@@ -166,7 +228,7 @@ def update_speed(total_speed_kb: float, speed_by_source: dict = None):
     download_speed_bytes.set(total_speed_kb * 1024)  # Convert to bytes/s
     if speed_by_source:
         for source, speed_kb in speed_by_source.items():
-            download_speed_by_source.labels(source=source).set(speed_kb * 1024)
+            _child(download_speed_by_source, source).set(speed_kb * 1024)
 
 
 def update_pending_bytes(pending: int):
@@ -182,10 +244,10 @@ def update_db_stats(stats_by_status: dict, stats_by_author: dict = None):
         stats_by_author: Dict of {(author, status): count}
     """
     for status, count in stats_by_status.items():
-        db_downloads_count.labels(status=status).set(count)
+        _child(db_downloads_count, status).set(count)
     if stats_by_author:
         for (author, status), count in stats_by_author.items():
-            db_downloads_by_author.labels(author=author, status=status).set(count)
+            _child(db_downloads_by_author, author, status).set(count)
 
 
 def update_queue_size(size: int):
@@ -0,0 +1,68 @@
+"""
+Registry of running downloads shared by the downloaders and the web app
+"""
+import asyncio
+import threading
+
+
+class TaskRegistry(dict):
+    """message_id -> running download (asyncio.Task, concurrent Future or
+    Thread). A dict whose mutations are serialized by a lock, and that lets
+    coroutines await a download leaving the registry instead of polling."""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._waiters = {}  # message_id -> [(loop, future)]
+
+    def __setitem__(self, key, value):
+        done = getattr(value, 'done', None)
+        with self._lock:
+            if done is not None and done():
+                # Finished before it was registered; its pop() already ran
+                super().pop(key, None)
+                waiters = self._waiters.pop(key, ())
+            else:
+                super().__setitem__(key, value)
+                return
+        self._wake(waiters)
+
+    def pop(self, key, *default):
+        with self._lock:
+            value = super().pop(key, *default)
+            waiters = self._waiters.pop(key, ())
+        self._wake(waiters)
+        return value
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+    async def wait_removed(self, key):
+        """Return once `key` is no longer registered (immediately if it
+        isn't). Safe to await on any loop, whichever thread pops the key."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._lock:
+            if key not in self:
+                return
+            self._waiters.setdefault(key, []).append((loop, fut))
+        await fut
+
+    @staticmethod
+    def _wake(waiters):
+        for loop, fut in waiters:
+            loop.call_soon_threadsafe(_resolve, fut)
+
+
+def _resolve(fut):
+    if not fut.done():
+        fut.set_result(None)
+
+
+# Global registry instance (shared by main, the downloaders and file_meta)
+download_tasks = TaskRegistry()
+
+
+def get_download_tasks():
+    """Get the global download task registry"""
+    return download_tasks
@@ -1,26 +1,53 @@
 """
 Telegram client and download handler
 """
+import aiofiles
 import asyncio
 import json
 import logging
 import os
+import random
 import re
 import subprocess
+import time
 from datetime import datetime
+from functools import partial
 from telethon import TelegramClient, events, utils as tg_utils
-from telethon.errors import SessionPasswordNeededError
+from telethon.errors import (
+    AuthKeyError, FileReferenceExpiredError, FloodWaitError, SessionPasswordNeededError, UnauthorizedError,
+)
 from telethon.tl.types import User as TgUser
-from backend.config import API_ID, API_HASH, CHAT_ID, DOWNLOAD_DIR, MAX_RETRIES, SESSION_FILE
+from backend.config import API_ID, API_HASH, CHAT_ID, DOWNLOAD_DIR, DOWNLOAD_WORKERS, MAX_RETRIES, SESSION_FILE
 from backend.database import get_db
-from backend.utils import human_readable_size, get_media_folder
-from backend.web_app import get_socketio
+from backend.utils import human_readable_size, get_media_folder, run_blocking
+from backend.web_app import get_web_app, queue_emit
 from backend import metrics
 from backend.file_meta import poll_and_extract_meta, is_video_file
 
 CHANNELS_SETTING_KEY = 'telegram_channels'
 API_SETTING_KEY = 'telegram_api'
 QUERY_TIMEOUT = 30  # seconds a query snippet may run
+STATUS_TTL = 30  # seconds the settings page may reuse the authorized account info
+PROGRESS_EMIT_INTERVAL = 0.5  # seconds between batched downloads:progress emits
+# A running download's progress/bytes reach the DB only once they move this
+# far (the UI gets every tick over Socket.IO regardless)
+PROGRESS_WRITE_STEP = 1.0  # percent
+BYTES_WRITE_STEP = 1024 * 1024
+
+# Retry backoff for safe_download: BASE * 2^(attempt-1), capped, plus jitter so
+# concurrent downloads failing together don't retry in lockstep
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RETRY_JITTER = 0.5
+RETRY_DEADLINE = 600  # seconds after the first failure to stop retrying
+# Errors a retry can't fix (stale file reference, revoked/unauthorized session)
+FATAL_DOWNLOAD_ERRORS = (FileReferenceExpiredError, AuthKeyError, UnauthorizedError)
+
+REQUEST_SIZE = 524288  # 512KB per getFile request
+PARALLEL_MIN_SIZE = 32 * 1024 * 1024  # smaller files download sequentially
+PART_RETRIES = 3  # attempts per range before the whole download attempt fails
+# Range requests in flight across all downloads, to stay clear of flood waits
+_part_slots = asyncio.Semaphore(8)
 
 # Seeded on first run so the Queries tab has working examples
 DEFAULT_QUERIES = [
@@ -49,11 +76,61 @@ DEFAULT_QUERIES = [
 ]
 
 
+def _retry_delay(attempt, error):
+    """Seconds to wait before retry `attempt + 1`. A FloodWaitError's own wait
+    is the floor, since retrying earlier only earns another flood wait."""
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** (attempt - 1)))
+    delay *= 1 + random.uniform(0, RETRY_JITTER)
+    if isinstance(error, FloodWaitError):
+        delay = max(delay, error.seconds)
+    return delay
+
+
+def _full_name(entity):
+    """'First Last' for a Telegram user (either part may be missing), '' if neither."""
+    return ' '.join(filter(None, [getattr(entity, 'first_name', None),
+                                  getattr(entity, 'last_name', None)]))
+
+
+def _changed(field, old, new):
+    """Whether a progress field moved enough to be written to the DB again."""
+    if old is None or new is None:
+        return new != old
+    if field == 'progress':
+        return abs(new - old) >= PROGRESS_WRITE_STEP
+    if field == 'downloaded_bytes':
+        return abs(new - old) >= BYTES_WRITE_STEP
+    if field in ('speed', 'pending_time') and old and new:
+        return abs(new - old) > abs(old) * 0.05
+    return new != old
+
+
+class _DownloadProgress:
+    """Progress bookkeeping for one safe_download, shared by all its attempts."""
+    __slots__ = ('event', 'entry', 'total_bytes', 'downloaded', 'last_bytes', 'last_emit', 'last_update',
+                 'written')
+
+    def __init__(self, event, entry, total_bytes):
+        self.event = event
+        self.entry = entry
+        self.total_bytes = total_bytes
+        self.downloaded = self.last_bytes = 0
+        self.last_emit = self.last_update = 0.0
+        self.written = {}  # progress fields as last written to the DB
+
+
 class TelegramDownloader:
     def __init__(self, download_tasks):
         self.download_tasks = download_tasks
 
-        self.last_broadcast = 0
+        # message_id -> latest download:progress payload not yet emitted; drained
+        # by _progress_dispatcher so the download loop never waits on Socket.IO
+        self._pending_emits = {}
+        self._dispatcher = None
+        # message_id -> (event, entry) awaiting a progress edit of its Telegram
+        # status message; served one at a time by _status_edit_worker
+        self._pending_edits = {}
+        self._edit_worker = None
         self.authorized = False
         self._stopping = False
         self._handler = None  # Currently registered NewMessage handler
@@ -66,6 +143,12 @@ class TelegramDownloader:
         # Pending web-login state (phone -> code -> optional 2FA password)
         self._login_phone = None
         self._login_code_hash = None
+        # (monotonic time, authorized, user dict) from the last get_status;
+        # reset whenever the login state changes
+        self._status_cache = None
+        # Set (on the client loop) when a client is created or on stop, waking
+        # _run while it waits for API credentials; created by _run
+        self._client_ready = None
 
         # API credentials: database setting first, .env as fallback. Without
         # them there is no client yet — it gets created once they are saved
@@ -85,11 +168,11 @@ class TelegramDownloader:
     def _load_api_credentials(self):
         """Return (api_id, api_hash, source) from the DB setting, falling back
         to the .env values. api_hash is stored encrypted at rest."""
-        from backend.utils import decrypt_secret
+        from backend.utils import decrypt_secret, json_loads
         raw = get_db().get_setting(API_SETTING_KEY)
         if raw:
             try:
-                cfg = json.loads(raw)
+                cfg = json_loads(raw)
                 api_id = int(cfg.get('api_id') or 0)
                 api_hash = decrypt_secret(cfg.get('api_hash_enc', ''))
                 if api_id and api_hash:
@@ -120,17 +203,28 @@ class TelegramDownloader:
             'api_id': api_id,
             'api_hash_enc': encrypt_secret(api_hash),
         }))
+        if self.client is not None and (api_id, api_hash) == (self.api_id, self.api_hash):
+            # Unchanged credentials: keep the live client, its session and
+            # connection instead of rebuilding and reconnecting
+            self.api_source = 'database'
+            return {'status': 'saved', **self.get_api_config()}
         old_client = self.client
         self.api_id, self.api_hash, self.api_source = api_id, api_hash, 'database'
         self.authorized = False
         self._login_phone = None
         self._login_code_hash = None
+        self._status_cache = None
+        if old_client:
+            # Unblocks run_until_disconnected; _run reconnects with the new
+            # client. Done first so the old client has closed its handle on
+            # the session file before the new one opens it.
+            await old_client.disconnect()
+        # Same session file: the saved login carries over to the new client
         self.client = TelegramClient(str(SESSION_FILE), api_id, api_hash)
         self._handler = None  # handler belonged to the old client
         self._register_handler()
-        if old_client:
-            # Unblocks run_until_disconnected; _run reconnects with the new client
-            await old_client.disconnect()
+        if self._client_ready is not None:
+            self._client_ready.set()
         return {'status': 'saved', **self.get_api_config()}
 
     # ------------------------------------------------------------------
@@ -139,11 +233,12 @@ class TelegramDownloader:
 
     def _load_channels(self):
         """Load monitored channels from settings, seeding from .env CHAT_ID."""
+        from backend.utils import json_loads
         db = get_db()
         raw = db.get_setting(CHANNELS_SETTING_KEY)
         if raw:
             try:
-                channels = json.loads(raw)
+                channels = json_loads(raw)
                 if isinstance(channels, list):
                     return [c for c in channels if isinstance(c, dict) and c.get('id')]
             except Exception as e:
@@ -243,8 +338,7 @@ class TelegramDownloader:
         chat_id = tg_utils.get_peer_id(entity)
         title = (getattr(entity, 'title', None)
                  or getattr(entity, 'username', None)
-                 or ' '.join(filter(None, [getattr(entity, 'first_name', None),
-                                           getattr(entity, 'last_name', None)]))
+                 or _full_name(entity)
                  or str(chat_id))
         if any(c['id'] == chat_id for c in self.channels):
             return {'error': f'"{title}" is already being monitored'}
@@ -329,7 +423,7 @@ class TelegramDownloader:
             for p in participants:
                 if not isinstance(p, TgUser) or p.bot or p.deleted:
                     continue
-                name = ' '.join(filter(None, [p.first_name, p.last_name]))
+                name = _full_name(p)
                 db.upsert_telegram_user(p.id, username=p.username, display_name=name or None)
                 self._seen_users[p.id] = (p.username, name)
                 total += 1
@@ -375,6 +469,10 @@ class TelegramDownloader:
         }
         if not connected:
             return status
+        cached = self._status_cache
+        if cached and time.monotonic() - cached[0] < STATUS_TTL:
+            status['authorized'], status['user'] = cached[1], cached[2]
+            return status
         try:
             status['authorized'] = await self.client.is_user_authorized()
             if status['authorized']:
@@ -388,6 +486,7 @@ class TelegramDownloader:
                         'phone': me.phone,
                         'is_bot': bool(getattr(me, 'bot', False)),
                     }
+            self._status_cache = (time.monotonic(), status['authorized'], status['user'])
         except Exception as e:
             logging.error(f"Telegram status check failed: {e}")
         return status
@@ -442,6 +541,7 @@ class TelegramDownloader:
         self.authorized = False
         self._login_phone = None
         self._login_code_hash = None
+        self._status_cache = None
         if self.client:
             await self.client.log_out()
         return {'status': 'logged_out'}
@@ -451,6 +551,7 @@ class TelegramDownloader:
         self.authorized = True
         self._login_phone = None
         self._login_code_hash = None
+        self._status_cache = None
         await self.refresh_channel_titles()
         await self.send_startup_greeting()
         # Register all current group members in the users table (best-effort,
@@ -459,54 +560,67 @@ class TelegramDownloader:
 
     def emit_progress(self, message_id: int, progress: float, downloaded_bytes: int,
                        total_bytes: int, speed: float, pending_time: float | None):
-        """Emit progress update for a specific download (throttled)"""
-        now = datetime.now().timestamp()
-        if now - self.last_broadcast >= 1:
-            self.last_broadcast = now
-            socketio = get_socketio()
-            if socketio:
-                socketio.emit('download:progress', {
-                    'message_id': str(message_id),  # String to avoid JS precision loss
-                    'progress': progress,
-                    'downloaded_bytes': downloaded_bytes,
-                    'total_bytes': total_bytes,
-                    'speed': speed,
-                    'pending_time': pending_time
-                })
-                # Also emit updated stats
-                from backend.web_app import get_web_app
-                web_app = get_web_app()
-                if web_app:
-                    web_app.emit_stats()
+        """Queue a progress update for a specific download. Updates are
+        coalesced per download and emitted by _progress_dispatcher."""
+        self._pending_emits[message_id] = {
+            'message_id': str(message_id),  # String to avoid JS precision loss
+            'progress': progress,
+            'downloaded_bytes': downloaded_bytes,
+            'total_bytes': total_bytes,
+            'speed': speed,
+            'pending_time': pending_time
+        }
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._progress_dispatcher())
+
+    async def _progress_dispatcher(self):
+        """Every PROGRESS_EMIT_INTERVAL, emit the latest progress of each
+        download that ticked as one batch, then stats once. Exits when
+        nothing is pending."""
+        while True:
+            await asyncio.sleep(PROGRESS_EMIT_INTERVAL)
+            batch, self._pending_emits = self._pending_emits, {}
+            if not batch:
+                return
+            # One event for every download that ticked: the client patches
+            # all of its rows in a single update instead of one per download
+            queue_emit('downloads:progress', list(batch.values()), with_stats=True)
 
     def emit_status(self, message_id: int, status: str, error: str | None = None):
         """Emit status change for a specific download"""
-        socketio = get_socketio()
-        if socketio:
-            data = {'message_id': str(message_id), 'status': status}  # String to avoid JS precision loss
-            if error:
-                data['error'] = error
-            socketio.emit('download:status', data)
+        # A still-queued progress tick would land after (and undo) this status
+        self._pending_emits.pop(message_id, None)
+        data = {'message_id': str(message_id), 'status': status}  # String to avoid JS precision loss
+        if error:
+            data['error'] = error
+        queue_emit('download:status', data)
 
     def emit_new_download(self, download: dict):
         """Emit new download added event (message_id already stringified in to_dict)"""
-        socketio = get_socketio()
-        if socketio:
-            socketio.emit('download:new', download)
-            # Also emit updated stats
-            from backend.web_app import get_web_app
-            web_app = get_web_app()
-            if web_app:
-                web_app.emit_stats()
+        queue_emit('download:new', download, with_stats=True)
 
     def emit_deleted(self, message_id: int):
         """Emit download deleted event"""
-        socketio = get_socketio()
-        if socketio:
-            socketio.emit('download:deleted', {'message_id': str(message_id)})
+        queue_emit('download:deleted', {'message_id': str(message_id)})
+
+    def _queue_status_edit(self, event, entry):
+        """Schedule a progress edit of the download's status message. Edits
+        for the same download coalesce; one worker sends them in turn."""
+        self._pending_edits[entry["message_id"]] = (event, entry)
+        if self._edit_worker is None or self._edit_worker.done():
+            self._edit_worker = asyncio.create_task(self._status_edit_worker())
+
+    async def _status_edit_worker(self):
+        while self._pending_edits:
+            message_id = next(iter(self._pending_edits))
+            event, entry = self._pending_edits.pop(message_id)
+            await self.edit_status_message(event, entry)
 
     async def edit_status_message(self, event, entry, status=None):
         """Edits the Telegram message with the current download status."""
+        if status is not None:
+            # A queued progress edit would overwrite this final status
+            self._pending_edits.pop(entry["message_id"], None)
         try:
             client = event.client
             if not entry.get("_status_msg_id"):
@@ -646,13 +760,17 @@ class TelegramDownloader:
             try:
                 msg = await event.reply("⬇️ Status: Downloading")
                 entry["_status_msg_id"] = msg.id
-                db.update_download_by_message_id(message_id, status_msg_id=msg.id)
+                db.patch_download_by_message_id(message_id, status_msg_id=msg.id)
             except Exception as e:
                 logging.error(f"Failed to send initial status message: {e}")
                 entry["_status_msg_id"] = None
 
         try:
             total_bytes = event.file.size or 0
+            fail_reason = 'max_retries'
+            first_failure = None
+            state = _DownloadProgress(event, entry, total_bytes)
+            advance = partial(self._advance_progress, db, state)
 
             for attempt in range(1, MAX_RETRIES + 1):
                 if attempt > 1:
@@ -661,62 +779,29 @@ class TelegramDownloader:
                 try:
                     # Determine resume offset from partial file
                     from pathlib import Path
-                    partial = Path(path)
-                    resume_offset = partial.stat().st_size if partial.exists() else 0
-                    downloaded = resume_offset
-                    last_bytes = downloaded
-                    start_time = datetime.now()
-                    last_update = 0
-                    last_emit = 0
-
-                    mode = 'ab' if resume_offset > 0 else 'wb'
-                    with open(path, mode) as f:
-                        async for chunk in self.client.iter_download(
-                            event.media,
-                            offset=resume_offset,
-                            file_size=total_bytes,
-                            request_size=524288,  # 512KB chunks
-                        ):
-                            f.write(chunk)
-                            downloaded += len(chunk)
-
-                            # Progress reporting (throttled to 1/sec)
-                            now = datetime.now()
-                            timestamp = now.timestamp()
-                            if timestamp - last_emit < 1:
-                                continue
-                            last_emit = timestamp
-
-                            delta = (now - start_time).total_seconds()
-                            speed = round((downloaded - last_bytes) / 1024 / delta, 1) if delta > 0 else 0
-                            last_bytes = downloaded
-                            start_time = now
-
-                            progress = round(downloaded / total_bytes * 100, 1) if total_bytes > 0 else 0
-                            pending_time = (total_bytes - downloaded) / (speed * 1024) if speed > 0 else None
-
-                            entry["progress"] = progress
-                            entry["downloaded_bytes"] = downloaded
-                            entry["total_bytes"] = total_bytes
-                            entry["speed"] = speed
-                            entry["pending_time"] = pending_time
-
-                            db.update_download_by_message_id(
-                                message_id,
-                                progress=progress,
-                                downloaded_bytes=downloaded,
-                                total_bytes=total_bytes,
-                                speed=speed,
-                                pending_time=pending_time
-                            )
-                            self.emit_progress(message_id, progress, downloaded, total_bytes, speed, pending_time)
-
-                            if entry.get("_status_msg_id") and timestamp - last_update >= 20:
-                                last_update = timestamp
-                                asyncio.create_task(self.edit_status_message(event, entry))
+                    part_file = Path(path)
+                    resume_offset = part_file.stat().st_size if part_file.exists() else 0
+                    state.downloaded = state.last_bytes = resume_offset
+                    state.last_emit = time.monotonic()
+
+                    # File writes go through aiofiles' thread pool, so a slow
+                    # disk stalls this download rather than the whole loop
+                    if DOWNLOAD_WORKERS > 1 and total_bytes - resume_offset >= PARALLEL_MIN_SIZE:
+                        part_file.touch()
+                        await self._download_parts(event.media, path, resume_offset, total_bytes, advance)
+                    else:
+                        async with aiofiles.open(path, 'ab' if resume_offset > 0 else 'wb') as f:
+                            async for chunk in self.client.iter_download(
+                                event.media,
+                                offset=resume_offset,
+                                file_size=total_bytes,
+                                request_size=REQUEST_SIZE,
+                            ):
+                                await f.write(chunk)
+                                advance(len(chunk))
 
                     # Download complete
-                    db.update_download_by_message_id(
+                    db.patch_download_by_message_id(
                         message_id,
                         status='done',
                         progress=100,
@@ -737,19 +822,133 @@ class TelegramDownloader:
                     return
                 except Exception as e:
                     error_msg = f"Attempt {attempt}/{MAX_RETRIES} failed: {str(e)}"
-                    db.update_download_by_message_id(message_id, error=error_msg)
+                    db.patch_download_by_message_id(message_id, error=error_msg)
                     logging.error(error_msg)
-                    await asyncio.sleep(5)
-
-            # All retries exhausted
-            db.update_download_by_message_id(message_id, status='failed', speed=0, pending_time=None)
+                    if isinstance(e, FATAL_DOWNLOAD_ERRORS):
+                        fail_reason = 'unrecoverable'
+                        break
+                    if attempt == MAX_RETRIES:
+                        break
+                    first_failure = first_failure or time.monotonic()
+                    delay = _retry_delay(attempt, e)
+                    if time.monotonic() - first_failure + delay > RETRY_DEADLINE:
+                        fail_reason = 'deadline'
+                        break
+                    await asyncio.sleep(delay)
+
+            # All retries exhausted (or the error can't be retried)
+            db.patch_download_by_message_id(message_id, status='failed', speed=0, pending_time=None)
             self.emit_status(message_id, 'failed')
             if entry.get("_status_msg_id"):
                 await self.edit_status_message(event, entry, "Failed")
-            metrics.record_download_failed('telegram', 'max_retries')
+            metrics.record_download_failed('telegram', fail_reason)
         finally:
             self.download_tasks.pop(message_id, None)
 
+    def _advance_progress(self, db, state, n):
+        """Count n more bytes written; at most once a second, report progress
+        to the DB, the web UI and (every 20s) the Telegram status message."""
+        state.downloaded += n
+        timestamp = time.monotonic()
+        delta = timestamp - state.last_emit
+        if delta < 1:
+            return
+        state.last_emit = timestamp
+
+        downloaded, total_bytes, entry = state.downloaded, state.total_bytes, state.entry
+        # One decimal place via integer tenths rather than round(); progress
+        # floors, so 100% only shows once the file is complete
+        speed = int((downloaded - state.last_bytes) / delta / 102.4) / 10  # KB/s
+        state.last_bytes = downloaded
+
+        progress = downloaded * 1000 // total_bytes / 10 if total_bytes > 0 else 0
+        pending_time = (total_bytes - downloaded) / (speed * 1024) if speed > 0 else None
+
+        entry["progress"] = progress
+        entry["downloaded_bytes"] = downloaded
+        entry["total_bytes"] = total_bytes
+        entry["speed"] = speed
+        entry["pending_time"] = pending_time
+
+        message_id = entry["message_id"]
+        # Only write what moved enough since the last write: total_bytes is
+        # fixed, progress/bytes wait for PROGRESS_WRITE_STEP/BYTES_WRITE_STEP
+        # and speed/ETA jitter under ~5% isn't worth a row update. The final
+        # tick writes every field that differs at all
+        fields = {'progress': progress, 'downloaded_bytes': downloaded, 'total_bytes': total_bytes,
+                  'speed': speed, 'pending_time': pending_time}
+        if total_bytes > 0 and downloaded >= total_bytes:
+            changes = {k: v for k, v in fields.items() if state.written.get(k, -1) != v}
+        else:
+            changes = {k: v for k, v in fields.items() if _changed(k, state.written.get(k, -1), v)}
+            if 'progress' in changes or 'downloaded_bytes' in changes:
+                # Keep the row's percentage and byte count in step
+                changes['progress'], changes['downloaded_bytes'] = progress, downloaded
+        if changes:
+            state.written.update(changes)
+            db.patch_download_by_message_id(message_id, **changes)
+        self.emit_progress(message_id, progress, downloaded, total_bytes, speed, pending_time)
+
+        if entry.get("_status_msg_id") and timestamp - state.last_update >= 20:
+            state.last_update = timestamp
+            self._queue_status_edit(state.event, entry)
+
+    async def _download_parts(self, media, path, start, total_bytes, advance):
+        """Fill path[start:total_bytes] (the file must exist) with
+        DOWNLOAD_WORKERS concurrent range requests, calling advance(n) per
+        chunk written. Each range writes through its own file handle.
+
+        On failure or cancellation the file is truncated to its contiguous
+        downloaded prefix, so the next attempt (or a resume) can continue
+        from the file size as the sequential path does."""
+        # Range lengths are whole requests, so `limit` (counted in chunks) is exact
+        part = -(-(total_bytes - start) // DOWNLOAD_WORKERS // REQUEST_SIZE) * REQUEST_SIZE
+        ranges = [(lo, min(lo + part, total_bytes)) for lo in range(start, total_bytes, part)]
+        written = [0] * len(ranges)
+
+        async def fetch(i, lo, hi):
+            # A failed range retries on its own from where it stopped; the
+            # whole download only fails once one range runs out of retries
+            async with aiofiles.open(path, 'r+b') as f:
+                for attempt in range(1, PART_RETRIES + 1):
+                    try:
+                        await f.seek(lo + written[i])
+                        async with _part_slots:
+                            async for chunk in self.client.iter_download(
+                                media,
+                                offset=lo + written[i],
+                                limit=-(-(hi - lo - written[i]) // REQUEST_SIZE),
+                                file_size=total_bytes,
+                                request_size=REQUEST_SIZE,
+                            ):
+                                chunk = chunk[:hi - lo - written[i]]
+                                await f.write(chunk)
+                                written[i] += len(chunk)
+                                advance(len(chunk))
+                        return
+                    except FATAL_DOWNLOAD_ERRORS:
+                        raise
+                    except Exception as e:
+                        if attempt == PART_RETRIES:
+                            raise
+                        logging.warning(f"Range {lo}-{hi} failed ({e}), retrying from {lo + written[i]}")
+                        await asyncio.sleep(_retry_delay(attempt, e))
+
+        tasks = [asyncio.create_task(fetch(i, lo, hi)) for i, (lo, hi) in enumerate(ranges)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            prefix = start
+            for (lo, hi), n in zip(ranges, written):
+                prefix = lo + n
+                if prefix < hi:
+                    break
+            await run_blocking(os.truncate, path, prefix)
+            raise
+
     async def _handle_new_file(self, event):
         """Handle new file messages from Telegram"""
         # A reply to a completed-torrent prompt triggers the VPS→DownLee transfer.
@@ -792,8 +991,10 @@ class TelegramDownloader:
         except Exception as e:
             logging.error(f"Failed to get sender info: {e}")
 
-        # Add to database with Telegram message ID
-        new_download = db.add_download(
+        # Add to database with Telegram message ID. The insert runs in the
+        # executor so a burst of posted files doesn't queue up on DB round trips
+        new_download = await run_blocking(
+            db.add_download,
             file=filename,
             status='downloading',
             progress=0,
@@ -807,7 +1008,7 @@ class TelegramDownloader:
             chat_id=event.chat_id,
         )
 
-        # Emit new download event
+        # Emit new download event (sent, with stats, from the emitter thread)
         self.emit_new_download(new_download)
 
         # Create entry dict for status message tracking
@@ -830,9 +1031,7 @@ class TelegramDownloader:
         torrent client. They download into telegram/downloads (temp in
         telegram/progress) and start automatically. The client calls are sync, so
         they run in an executor to avoid blocking the Telegram event loop."""
-        from functools import partial
         from backend.web_app import torrent_telegram_dirs, torrent_add_magnet
-        loop = asyncio.get_event_loop()
 
         client = self.torrent_client_for_chat(event.chat_id)
         if not client:
@@ -846,8 +1045,7 @@ class TelegramDownloader:
             return
 
         try:
-            download_dir, progress_dir = await loop.run_in_executor(
-                None, partial(torrent_telegram_dirs, client))
+            download_dir, progress_dir = await run_blocking(torrent_telegram_dirs, client)
         except Exception as e:
             logging.error(f"Cannot route Telegram magnet to {client}: {e}")
             try:
@@ -858,10 +1056,10 @@ class TelegramDownloader:
 
         for magnet in magnets:
             try:
-                result = await loop.run_in_executor(None, partial(
+                result = await run_blocking(
                     torrent_add_magnet, client, magnet,
                     download_dir=download_dir, incomplete_dir=progress_dir,
-                ))
+                )
                 name = result.get('name') or 'torrent'
                 torrent_hash = result.get('hash')
                 duplicate = result.get('duplicate')
@@ -892,14 +1090,12 @@ class TelegramDownloader:
         until the torrent completes, errors, or is removed. max_polls caps runtime
         so a stalled torrent can't leak the task (default ~12h at a 15s interval)."""
         import posixpath
-        from functools import partial
         from backend.web_app import torrent_get, torrent_set_location, torrent_telegram_dirs
-        loop = asyncio.get_event_loop()
         last_text = None
         for _ in range(max_polls):
             await asyncio.sleep(interval)
             try:
-                t = await loop.run_in_executor(None, partial(torrent_get, client, torrent_hash))
+                t = await run_blocking(torrent_get, client, torrent_hash)
             except Exception as e:
                 logging.error(f"Torrent progress poll failed for {name}: {e}")
                 continue
@@ -918,15 +1114,15 @@ class TelegramDownloader:
                 # temp/progress dir into the final download dir.
                 if download_dir:
                     try:
-                        await loop.run_in_executor(None, partial(
-                            torrent_set_location, client, [torrent_hash], download_dir))
+                        await run_blocking(
+                            torrent_set_location, client, [torrent_hash], download_dir)
                     except Exception as e:
                         logging.error(f"torrent-set-location failed for {name}: {e}")
                 # Candidate remote paths: final dir first, then the temp dir in
                 # case the move hasn't landed yet (resolved over SFTP on demand).
                 candidates = [posixpath.join(download_dir, name)] if download_dir else []
                 try:
-                    tg_dl, tg_prog = await loop.run_in_executor(None, partial(torrent_telegram_dirs, client))
+                    tg_dl, tg_prog = await run_blocking(torrent_telegram_dirs, client)
                     candidates += [posixpath.join(tg_dl, name), posixpath.join(tg_prog, name)]
                 except Exception:
                     pass
@@ -997,16 +1193,13 @@ class TelegramDownloader:
     async def _start_downlee_from_torrent(self, pending):
         """Start the VPS→DownLee transfer for a completed torrent and report back
         on its Telegram message."""
-        from functools import partial
-        from backend.web_app import get_web_app
         msg, name = pending['msg'], pending['name']
         candidates = pending.get('candidates') or ([pending['path']] if pending.get('path') else [])
         web = get_web_app()
         if not (web and getattr(web, 'vps_downloader', None)):
             await self._safe_edit(msg, f"`{name}` — VPS downloader unavailable")
             return
-        loop = asyncio.get_event_loop()
-        path = await loop.run_in_executor(None, partial(self._resolve_existing_remote, candidates))
+        path = await run_blocking(self._resolve_existing_remote, candidates)
         if not path:
             await self._safe_edit(msg, f"❌ `{name}`: files not found on the VPS yet — try again shortly")
             return
@@ -1018,8 +1211,8 @@ class TelegramDownloader:
             if client in CLIENTS:
                 dest = ((read_torrent_settings().get(client) or {}).get('local_dir') or '').strip() or None
         try:
-            res = await loop.run_in_executor(None, partial(
-                web.vps_downloader.start_download, path, pending.get('size') or 0, dest))
+            res = await run_blocking(
+                web.vps_downloader.start_download, path, pending.get('size') or 0, dest)
         except Exception as e:
             logging.error(f"Failed to start DownLee transfer for {name}: {e}")
             await self._safe_edit(msg, f"❌ `{name}`: could not start download to DownLee")
@@ -1137,7 +1330,7 @@ class TelegramDownloader:
             except Exception as e:
                 logging.error(f"Could not resolve message sender: {e}")
             if isinstance(sender, TgUser) and not sender.bot:
-                name = ' '.join(filter(None, [sender.first_name, sender.last_name]))
+                name = _full_name(sender)
                 cache_val = (sender.username, name)
                 if self._seen_users.get(sender.id) != cache_val:
                     get_db().upsert_telegram_user(
@@ -1173,8 +1366,7 @@ class TelegramDownloader:
                 # Expose the invoker and chat to the snippet as env vars
                 extra_env = {}
                 if sender:
-                    name = ' '.join(filter(None, [getattr(sender, 'first_name', None),
-                                                  getattr(sender, 'last_name', None)]))
+                    name = _full_name(sender)
                     extra_env['SENDER_NAME'] = name or getattr(sender, 'username', None) or ''
                     extra_env['SENDER_USERNAME'] = getattr(sender, 'username', None) or ''
                     extra_env['SENDER_ID'] = str(getattr(sender, 'id', ''))
@@ -1217,22 +1409,24 @@ class TelegramDownloader:
         credentials) until a login completes via the web UI
         (Settings -> Telegram)."""
         print("🚀 DownLee running...")
-        try:
-            self.loop = asyncio.get_event_loop()  # For cross-thread scheduling
-        except RuntimeError:
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
+        # Owned by this (main) thread for its whole life; web routes submit
+        # coroutines to it via run_coroutine_threadsafe (WebApp._telegram_call)
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
         self.loop.run_until_complete(self._run())
 
     async def _run(self):
         warned_no_api = False
+        self._client_ready = asyncio.Event()
         while not self._stopping:
             client = self.client
             if client is None:
                 if not warned_no_api:
                     warned_no_api = True
                     print("⚠️  Telegram API credentials not set — add them via the web UI (Settings → Telegram)")
-                await asyncio.sleep(2)
+                # Sleeps until set_api_credentials creates a client (or stop)
+                await self._client_ready.wait()
+                self._client_ready.clear()
                 continue
             warned_no_api = False
             try:
@@ -1248,11 +1442,14 @@ class TelegramDownloader:
             except Exception as e:
                 logging.error(f"Telegram client error: {e}")
             self.authorized = False
+            self._status_cache = None
             if not self._stopping:
                 await asyncio.sleep(2)
 
     def stop(self):
         """Stop the Telegram client"""
         self._stopping = True
+        if self._client_ready is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._client_ready.set)
         if self.client:
             self.client.disconnect()
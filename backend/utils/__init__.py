@@ -1,13 +1,18 @@
 """
 Utility functions for DownLee
 """
-import os
 import json
+import asyncio
+import functools
 import base64
 import hashlib
-from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
 
 # Legacy hardcoded fallback secret used by older releases when JWT_SECRET was
 # unset. It MUST remain here (and only here): installs that ran with it have
@@ -118,32 +123,61 @@ def spec_folder(spec, default: Path) -> Path:
     return default
 
 
+def json_loads(data):
+    """Parse JSON from str or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj, indent=False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed.
+    Unknown types (datetime, Path, ...) are stringified."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, default=str, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=str).encode()
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking call in the default executor from a coroutine.
+
+    Unlike asyncio.to_thread this doesn't copy the contextvars context for
+    each call; none of the blocking helpers here read context variables."""
+    loop = asyncio.get_running_loop()
+    if kwargs:
+        fn = functools.partial(fn, *args, **kwargs)
+        args = ()
+    return await loop.run_in_executor(None, fn, *args)
+
+
 def save_state(downloads, downloads_json_path):
     """Save download state to JSON file"""
-    with open(downloads_json_path, "w") as f:
-        json.dump(downloads, f, indent=2, default=str)
+    Path(downloads_json_path).write_bytes(json_dumps(downloads, indent=True))
 
 
 def load_state(downloads_json_path):
     """Load previous downloads from JSON file"""
     try:
-        with open(downloads_json_path, "r") as f:
-            saved_data = json.load(f)
-            if isinstance(saved_data, list):
-                return saved_data
-            else:
-                return saved_data.get("downloads", [])
+        saved_data = json_loads(Path(downloads_json_path).read_bytes())
+        if isinstance(saved_data, list):
+            return saved_data
+        else:
+            return saved_data.get("downloads", [])
     except Exception:
         return []
 
 
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+
 def human_readable_size(num_bytes):
     """Convert bytes to human readable format"""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if num_bytes < 1024:
-            return f"{num_bytes:.1f}{unit}"
-        num_bytes /= 1024
-    return f"{num_bytes:.1f}PB"
+    if num_bytes < 1024:
+        return f"{num_bytes:.1f}B"
+    # Each unit is 10 more bits, so the bit length picks it without a loop
+    i = min((int(num_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{num_bytes / (1 << (10 * i)):.1f}{_SIZE_UNITS[i]}"
 
 
 def format_time(seconds):
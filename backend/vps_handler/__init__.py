@@ -8,7 +8,6 @@ each download runs in its own daemon thread (not the asyncio loop).
 Also runs an hourly autoSync scheduler that watches folders flagged auto_sync and
 auto-downloads files that appear after sync was enabled.
 """
-import os
 import time
 import stat as stat_module
 import posixpath
@@ -21,6 +20,7 @@ from pathlib import Path
 from backend.config import DOWNLOAD_DIR
 from backend.database import get_db, generate_uuid
 from backend import metrics
+from backend.web_app import queue_emit
 from backend.file_meta import poll_and_extract_meta, is_video_file
 
 logger = logging.getLogger(__name__)
@@ -59,41 +59,23 @@ class VpsDownloader:
 
     # --- WebSocket emit helpers (mirror ytdlp_handler) --------------------
     def emit_progress(self, message_id, progress, downloaded_bytes, total_bytes, speed, pending_time):
-        from backend.web_app import get_socketio, get_web_app
-        socketio = get_socketio()
-        if socketio:
-            socketio.emit('download:progress', {
-                'message_id': message_id,
-                'progress': progress,
-                'downloaded_bytes': downloaded_bytes,
-                'total_bytes': total_bytes,
-                'speed': speed,
-                'pending_time': pending_time,
-            })
-            web_app = get_web_app()
-            if web_app:
-                web_app.emit_stats()
+        queue_emit('download:progress', {
+            'message_id': message_id,
+            'progress': progress,
+            'downloaded_bytes': downloaded_bytes,
+            'total_bytes': total_bytes,
+            'speed': speed,
+            'pending_time': pending_time,
+        }, with_stats=True)
 
     def emit_status(self, message_id, status, error=None):
-        from backend.web_app import get_socketio, get_web_app
-        socketio = get_socketio()
-        if socketio:
-            data = {'message_id': message_id, 'status': status}
-            if error:
-                data['error'] = error
-            socketio.emit('download:status', data)
-            web_app = get_web_app()
-            if web_app:
-                web_app.emit_stats()
+        data = {'message_id': message_id, 'status': status}
+        if error:
+            data['error'] = error
+        queue_emit('download:status', data, with_stats=True)
 
     def emit_new_download(self, download):
-        from backend.web_app import get_socketio, get_web_app
-        socketio = get_socketio()
-        if socketio:
-            socketio.emit('download:new', download)
-            web_app = get_web_app()
-            if web_app:
-                web_app.emit_stats()
+        queue_emit('download:new', download, with_stats=True)
 
     # --- Download ---------------------------------------------------------
     def start_download(self, remote_path: str, size: int = 0, dest: str = None) -> dict:
@@ -143,7 +125,7 @@ class VpsDownloader:
         if existing and existing.is_alive():
             return True
         self.cancelled.discard(message_id)
-        db.update_download_by_message_id(message_id, status='downloading', speed=0, error=None)
+        db.patch_download_by_message_id(message_id, status='downloading', speed=0, error=None)
         self.emit_status(message_id, 'downloading')
         self._spawn(dl['url'], message_id)
         return True
@@ -222,13 +204,13 @@ class VpsDownloader:
                     ls = lp.stat().st_size
                     transferred[0] += min(ls, rsize) if rsize else ls
 
-            state = {'last_update': 0.0, 'last_bytes': transferred[0], 'last_time': start_time.timestamp()}
+            state = {'last_update': 0.0, 'last_bytes': transferred[0], 'last_time': time.monotonic()}
 
             def bump(delta):
                 transferred[0] += delta
                 if message_id in self.cancelled:
                     raise _Cancelled()
-                now = time.time()
+                now = time.monotonic()
                 if now - state['last_update'] < 1:
                     return
                 elapsed = now - state['last_time']
@@ -238,7 +220,7 @@ class VpsDownloader:
                 state['last_update'] = now
                 state['last_bytes'] = transferred[0]
                 state['last_time'] = now
-                db.update_download_by_message_id(
+                db.patch_download_by_message_id(
                     message_id, progress=progress, downloaded_bytes=transferred[0],
                     total_bytes=total_bytes, speed=speed, pending_time=pending_time,
                 )
@@ -253,7 +235,7 @@ class VpsDownloader:
 
             sftp.close()
 
-            db.update_download_by_message_id(
+            db.patch_download_by_message_id(
                 message_id, status='done', progress=100, speed=0,
                 pending_time=0, downloaded_bytes=total_bytes, total_bytes=total_bytes,
             )
@@ -267,7 +249,7 @@ class VpsDownloader:
         except _Cancelled:
             # Keep partial files so the download can resume later.
             logger.info(f"[vps] Download stopped (partial kept): {remote_path}")
-            db.update_download_by_message_id(message_id, status='stopped', speed=0)
+            db.patch_download_by_message_id(message_id, status='stopped', speed=0)
             self.emit_status(message_id, 'stopped')
             metrics.record_download_stopped('vps')
         except Exception as e:
@@ -275,13 +257,13 @@ class VpsDownloader:
                 # stop_download() force-closed the connection mid-transfer;
                 # report it as a stop, not a failure.
                 logger.info(f"[vps] Download stopped (partial kept): {remote_path}")
-                db.update_download_by_message_id(message_id, status='stopped', speed=0)
+                db.patch_download_by_message_id(message_id, status='stopped', speed=0)
                 self.emit_status(message_id, 'stopped')
                 metrics.record_download_stopped('vps')
             else:
                 # Keep partial files so a retry can resume.
                 logger.error(f"[vps] Download error for {remote_path}: {e}")
-                db.update_download_by_message_id(message_id, status='failed', speed=0, error=str(e))
+                db.patch_download_by_message_id(message_id, status='failed', speed=0, error=str(e))
                 self.emit_status(message_id, 'failed', str(e))
                 metrics.record_download_failed('vps', 'exception')
         finally:
@@ -13,6 +13,12 @@ helpers, WebApp, ...) are re-exported here so existing
 `from backend.web_app import X` imports keep working.
 """
 import asyncio
+import concurrent.futures
+import heapq
+import logging
+import threading
+import time
+from operator import itemgetter
 from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
 from flask_socketio import SocketIO
@@ -22,7 +28,7 @@ from backend import metrics
 
 from backend.web_app import base as _base
 from backend.web_app.base import (
-    get_socketio, get_web_app, token_required,
+    get_socketio, get_web_app, queue_emit, token_required,
     JWT_EXPIRY_DAYS, FRONTEND_DIST, PASSWORD_CHANGE_ALLOWED_PATHS,
 )
 from backend.web_app.torrent import (
@@ -45,6 +51,18 @@ from backend.web_app.routes.torrent import TorrentRoutesMixin
 from backend.web_app.routes.vps_browse import VpsBrowseRoutesMixin
 from backend.web_app.routes.media import MediaRoutesMixin
 
+METRICS_REFRESH_INTERVAL = 1.0  # seconds; scrapes within this window reuse the gauges
+STATS_EMIT_INTERVAL = 0.25  # seconds; stats emits requested within this window are merged
+STATS_CACHE_TTL = 0.5  # seconds; get_stats() calls within this window share one query
+
+# /api/downloads sort_by -> (download field, value sorted in place of NULL)
+DOWNLOAD_SORT_FIELDS = {
+    'created_at': ('created_at', ''),
+    'file': ('file', ''),
+    'status': ('status', ''),
+    'progress': ('progress', 0),
+}
+
 
 class WebApp(
     AuthRoutesMixin, DownloadRoutesMixin, UrlRoutesMixin, AnalyticsRoutesMixin,
@@ -57,11 +75,23 @@ class WebApp(
         self.telegram_downloader = telegram_downloader
         self.vps_downloader = vps_downloader
         self.event_loop = event_loop
+        self._metrics_lock = threading.Lock()
+        self._metrics_refreshed_at = 0.0
+        self._stats_lock = threading.Lock()
+        self._stats_pending = False  # a debounced stats emit is scheduled
+        self._stats_cache = None  # (generation, monotonic time, stats)
+        self._stats_generation = 0  # bumped by emit_stats on every change
         self.app = Flask(__name__, static_folder=str(FRONTEND_DIST), static_url_path='')
         CORS(self.app, resources={r"/*": {"origins": "*"}})
+        # Encode API responses and socket packets with orjson when installed
+        socketio_options = {}
+        if _base.orjson is not None:
+            self.app.json = _base.OrjsonProvider(self.app)
+            socketio_options['json'] = _base.SocketJSON
         # socketio/_web_app live on the shared base module so other modules can
         # reach them via get_socketio()/get_web_app().
-        _base.socketio = SocketIO(self.app, cors_allowed_origins="*", async_mode='threading')
+        _base.socketio = SocketIO(self.app, cors_allowed_origins="*", async_mode='threading',
+                                  **socketio_options)
         self.socketio = _base.socketio
         _base._web_app = self
         self.setup_routes()
@@ -79,19 +109,21 @@ class WebApp(
         def handle_disconnect():
             print("Client disconnected")
 
-    def _annotate_downloads(self, downloads):
+    def _annotate_downloads(self, rows):
         """Stamp each download with computed `hidden` and `dest_folder` from
         the per-source mappings and per-VPS-watchfolder specs. Computed at
-        query time so spec changes apply to existing downloads too."""
+        query time so spec changes apply to existing downloads too.
+
+        Takes the (download, mapping) pairs from get_all_downloads_with_maps
+        and returns the annotated downloads."""
         db = get_db()
-        maps = {m['downloaded_from']: m for m in db.get_all_download_type_maps()}
         vps_folders = (
             db.get_vps_watch_folders()
-            if any(d.get('downloaded_from') == 'vps' for d in downloads) else []
+            if any(d.get('downloaded_from') == 'vps' for d, _ in rows) else []
         )
-        for d in downloads:
+        downloads = []
+        for d, mapping in rows:
             source = d.get('downloaded_from') or 'telegram'
-            mapping = maps.get(source, {})
             hidden = bool(mapping.get('is_secured'))
             folder = mapping.get('folder')
             if source == 'vps':
@@ -108,6 +140,7 @@ class WebApp(
                     hidden = hidden or bool(best.get('is_secured'))
             d['hidden'] = hidden
             d['dest_folder'] = folder
+            downloads.append(d)
         return downloads
 
     def get_downloads_data(self, search='', filter_type='all', sort_by='created_at', sort_order='desc',
@@ -125,61 +158,42 @@ class WebApp(
             include_hidden: Include downloads from secured sources/folders
         """
         db = get_db()
-        all_downloads = self._annotate_downloads(db.get_all_downloads())
+        # Plain column filters run in SQL, so annotation and search see fewer rows
+        rows = db.get_all_downloads_with_maps(author=author, active_only=filter_type == 'active')
+        annotated = self._annotate_downloads(rows)
 
+        # One pass for the secured-source filter and the search
         query = search.lower().strip()
-        if query:
-            filtered_list = []
-            for d in all_downloads:
-                # Check filename
-                file_name = (d.get("file") or "").lower()
-                # Check downloaded_from source
-                downloaded_from = (d.get("downloaded_from") or "").lower()
-                # Check URL
-                url = (d.get("url") or "").lower()
-                # Check author
-                d_author = (d.get("author") or "").lower()
-
-                # Exact substring match first
-                if query in file_name or query in downloaded_from or query in url or query in d_author:
-                    filtered_list.append(d)
-                    continue
-
-                # Fuzzy search: check if all query words appear in any field
-                query_words = query.split()
-                searchable_text = f"{file_name} {downloaded_from} {url} {d_author}"
-                if all(word in searchable_text for word in query_words):
-                    filtered_list.append(d)
-        else:
-            filtered_list = all_downloads
-
-        # Filter out downloads from secured sources/folders
-        if not include_hidden:
-            filtered_list = [d for d in filtered_list if not d.get("hidden")]
-
-        # Filter by author
-        if author:
-            filtered_list = [d for d in filtered_list if d.get("author") == author]
-
-        # Apply filter_type
-        if filter_type == 'active':
-            filtered_list = [d for d in filtered_list if d.get("status") != "done"]
-
-        # Apply sorting
-        reverse = sort_order == 'desc'
-        if sort_by == 'created_at':
-            sorted_list = sorted(filtered_list, key=lambda x: x.get("created_at") or "", reverse=reverse)
-        elif sort_by == 'file':
-            sorted_list = sorted(filtered_list, key=lambda x: x.get("file", "").lower(), reverse=reverse)
-        elif sort_by == 'status':
-            sorted_list = sorted(filtered_list, key=lambda x: x.get("status", ""), reverse=reverse)
-        elif sort_by == 'progress':
-            sorted_list = sorted(filtered_list, key=lambda x: x.get("progress", 0), reverse=reverse)
-        else:
-            sorted_list = filtered_list
-
-        filtered_list = sorted_list
+        query_words = query.split()
+        filtered_list = []
+        for d in annotated:
+            # Filter out downloads from secured sources/folders
+            if not include_hidden and d.get("hidden"):
+                continue
+            if query:
+                # Filename, downloaded_from source, URL and author
+                fields = [(d.get(k) or "").lower() for k in ("file", "downloaded_from", "url", "author")]
+
+                # Exact substring match first, then fuzzy search: all query
+                # words appear somewhere across the fields
+                if not any(query in f for f in fields):
+                    searchable_text = " ".join(fields)
+                    if not all(word in searchable_text for word in query_words):
+                        continue
+            filtered_list.append(d)
+
+        # Apply sorting; only the rows up to the requested page are ordered
         total_count = len(filtered_list)
+        sort_field = DOWNLOAD_SORT_FIELDS.get(sort_by)
+        if sort_field:
+            # Extract every key in one comprehension, then rank the pairs by
+            # their first item without a Python-level key function
+            field, default = sort_field
+            keyed = [(d[field] or default, d) for d in filtered_list]
+            if sort_by == 'file':
+                keyed = [(k.lower(), d) for k, d in keyed]
+            pick = heapq.nlargest if sort_order == 'desc' else heapq.nsmallest
+            filtered_list = [d for _, d in pick(offset + limit, keyed, key=itemgetter(0))]
 
         # Apply pagination
         paginated_list = filtered_list[offset:offset + limit]
@@ -192,48 +206,40 @@ class WebApp(
         }
 
     def get_stats(self):
-        """Get stats only (without downloads list)"""
-        db = get_db()
-        all_downloads = db.get_all_downloads()
-
-        # For completed downloads, count total_bytes (full file size)
-        # For active downloads, count downloaded_bytes (current progress)
-        total_downloaded = sum(
-            d.get("total_bytes", 0) or 0 if d.get("status") == "done"
-            else d.get("downloaded_bytes", 0) or 0
-            for d in all_downloads
-        )
-
-        # Total size is sum of all total_bytes
-        total_size = sum(d.get("total_bytes", 0) or 0 for d in all_downloads)
-
-        # Pending is for active and paused downloads
-        pending_bytes = sum(
-            (d.get("total_bytes", 0) or 0) - (d.get("downloaded_bytes", 0) or 0)
-            for d in all_downloads
-            if d.get("status") in ("downloading", "paused")
-        )
-
-        total_speed = sum(d.get("speed", 0) or 0 for d in all_downloads)
-        downloaded_count = sum(1 for d in all_downloads if d.get("status") == "done")
-        total_count = len(all_downloads)
-        active_count = sum(1 for d in all_downloads if d.get("status") != "done")
-
-        return {
-            "total_downloaded": total_downloaded,
-            "total_size": total_size,
-            "pending_bytes": pending_bytes,
-            "total_speed": total_speed,
-            "downloaded_count": downloaded_count,
-            "total_count": total_count,
-            "all_count": total_count,
-            "active_count": active_count
-        }
+        """Get stats only (without downloads list). Reuses the last result for
+        STATS_CACHE_TTL unless emit_stats() has invalidated it since."""
+        generation = self._stats_generation
+        now = time.monotonic()
+        cached = self._stats_cache
+        if cached and cached[0] == generation and now - cached[1] < STATS_CACHE_TTL:
+            return dict(cached[2])
+        # Completed downloads count their full size toward total_downloaded,
+        # active ones their current progress; pending covers active + paused
+        stats = get_db().get_download_stats()
+        # Tagged with the generation read before the query: if a change was
+        # signalled meanwhile, this result is never served from the cache
+        self._stats_cache = (generation, now, stats)
+        return dict(stats)
 
     def emit_stats(self):
-        """Emit current stats to all clients"""
-        stats = self.get_stats()
-        self.socketio.emit('stats', stats)
+        """Emit current stats to all clients, debounced: calls within
+        STATS_EMIT_INTERVAL share one get_stats() query and one emit."""
+        with self._stats_lock:
+            # Every change to downloads ends up here, so it also invalidates
+            # the cache, including results of queries already in flight
+            self._stats_generation += 1
+            if self._stats_pending:
+                return
+            self._stats_pending = True
+        self.socketio.start_background_task(self._emit_stats_later)
+
+    def _emit_stats_later(self):
+        self.socketio.sleep(STATS_EMIT_INTERVAL)
+        # Cleared before reading, so changes made during the query schedule
+        # another emit rather than being lost
+        with self._stats_lock:
+            self._stats_pending = False
+        self.socketio.emit('stats', self.get_stats())
 
     def emit_status(self, message_id, status: str):
         """Emit status change for a specific download"""
@@ -252,9 +258,21 @@ class WebApp(
         self.emit_stats()
 
     def _update_prometheus_metrics(self):
-        """Update Prometheus metrics from current database state"""
+        """Update Prometheus metrics from current database state.
+
+        Coalesced: overlapping or back-to-back scrapes (several Prometheus
+        replicas, Grafana live panels) share one DB pass per
+        METRICS_REFRESH_INTERVAL instead of each re-reading every row."""
+        with self._metrics_lock:
+            now = time.monotonic()
+            if now - self._metrics_refreshed_at < METRICS_REFRESH_INTERVAL:
+                return
+            self._refresh_prometheus_metrics()
+            self._metrics_refreshed_at = time.monotonic()
+
+    def _refresh_prometheus_metrics(self):
         db = get_db()
-        all_downloads = db.get_all_downloads()
+        all_downloads = db.get_download_summaries()
 
         # Count by status
         status_counts = {}
@@ -301,7 +319,13 @@ class WebApp(
         loop = getattr(td, 'loop', None) if td else None
         if loop is None:
             raise RuntimeError("Telegram client is not running yet")
-        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout=timeout)
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:  # the builtin on 3.11+, distinct on 3.10
+            # Don't leave the abandoned call running on the client's loop
+            future.cancel()
+            raise
 
     def setup_routes(self):
         """Register all Flask routes (grouped per-domain via mixins)."""
@@ -329,4 +353,8 @@ class WebApp(
 
     def run(self):
         """Run the Flask application with WebSocket support"""
+        # Werkzeug logs one INFO access line per request (API polls, video
+        # Range requests, socket.io transports) straight into the app log;
+        # keep only its warnings and errors.
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
         self.socketio.run(self.app, host=WEB_HOST, port=WEB_PORT, debug=False, use_reloader=False, allow_unsafe_werkzeug=True)
@@ -1,10 +1,15 @@
 """Shared Flask globals and the JWT auth decorator for the web_app package."""
 import jwt
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from pathlib import Path
 from flask import request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from backend.config import JWT_SECRET
 from backend.database import get_db
+from backend.utils import json_loads, orjson
 
 JWT_EXPIRY_DAYS = 30  # Keep signed in for 30 days
 
@@ -27,6 +32,86 @@ def get_web_app():
     return _web_app
 
 
+# Flask-SocketIO (threading mode) emits write to every client socket before
+# returning. The downloaders' loops hand them to this single worker instead:
+# a loop never waits on a slow browser, and events still go out in order.
+_emitter = ThreadPoolExecutor(max_workers=1, thread_name_prefix='socketio-emit')
+
+
+def queue_emit(event_name, data, with_stats=False):
+    """Queue a Socket.IO event (and optionally a stats refresh) for _emitter."""
+    _emitter.submit(_emit_now, event_name, data, with_stats)
+
+
+def _emit_now(event_name, data, with_stats):
+    if socketio is None:
+        return
+    try:
+        socketio.emit(event_name, data)
+        if with_stats and _web_app:
+            _web_app.emit_stats()
+    except Exception as e:
+        logging.error(f"Failed to emit {event_name}: {e}")
+
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson (installed as an optional
+    speedup). Datetimes and other non-native types still go through Flask's
+    default hook, so responses look the same as with the stdlib encoder."""
+    _options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    def _encode(self, obj):
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options)
+        except TypeError:  # e.g. ints beyond 64 bits
+            return super().dumps(obj).encode()
+
+    def dumps(self, obj, **kwargs):
+        return self._encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return json_loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj) + b"\n", mimetype=self.mimetype)
+
+
+class SocketJSON:
+    """json-module stand-in for python-socketio packet encoding via orjson."""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj, default=str).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return json_loads(s)
+
+
+# token -> decoded payload for tokens that already passed verification, so
+# repeat requests skip the HMAC check; entries are dropped at the token's exp
+_verified_tokens = {}
+VERIFIED_TOKENS_MAX = 4096
+
+
+def decode_token(token):
+    """jwt.decode for our HS256 tokens, cached per token until it expires.
+    Raises jwt.ExpiredSignatureError / jwt.InvalidTokenError like jwt.decode;
+    tokens that fail verification are never cached."""
+    data = _verified_tokens.get(token)
+    if data is not None:
+        if data.get('exp', 0) > time.time():
+            return data
+        _verified_tokens.pop(token, None)  # expired: let jwt.decode raise
+    data = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+    if 'exp' in data:
+        if len(_verified_tokens) >= VERIFIED_TOKENS_MAX:
+            _verified_tokens.clear()
+        _verified_tokens[token] = data
+    return data
+
 
 # Routes still usable while a forced password change is pending
 PASSWORD_CHANGE_ALLOWED_PATHS = {'/api/auth/verify', '/api/auth/password'}
@@ -50,7 +135,7 @@ def token_required(f):
             return jsonify({'error': 'Token is missing'}), 401
 
         try:
-            data = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+            data = decode_token(token)
             request.user = data
         except jwt.ExpiredSignatureError:
             return jsonify({'error': 'Token has expired'}), 401
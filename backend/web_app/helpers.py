@@ -1,6 +1,16 @@
 """Misc web helpers."""
+import time
 from pathlib import Path
 
+STREAM_LOCATE_TTL = 5  # seconds a resolved stream file is reused
+
+# download id -> (monotonic time, path, size): a player seeking through a
+# video sends a burst of Range requests for the same file
+_stream_locations = {}
+
+# download id -> path it was last found at, tried before the candidate list
+_file_locations = {}
+
 
 def candidate_file_paths(download, file_name):
     """Possible on-disk locations for a download's file, most specific first
@@ -19,3 +29,50 @@ def candidate_file_paths(download, file_name):
         paths.insert(0, Path(spec["folder"]) / file_name)
     return paths
 
+
+def locate_file(download, file_name):
+    """First candidate path that exists and its size, with a single stat per
+    candidate. Returns (None, None) when the file isn't on disk."""
+    for path in candidate_file_paths(download, file_name):
+        try:
+            return path, path.stat().st_size
+        except OSError:
+            continue
+    return None, None
+
+
+def locate_known_file(download_id, download, file_name):
+    """locate_file that first tries where this download was last found, so
+    a repeat lookup costs one stat instead of resolving every candidate."""
+    path = _file_locations.get(download_id)
+    if path is not None and path.name == file_name:
+        try:
+            return path, path.stat().st_size
+        except OSError:
+            pass
+    path, size = locate_file(download, file_name)
+    if path:
+        _file_locations[download_id] = path
+    else:
+        _file_locations.pop(download_id, None)
+    return path, size
+
+
+def locate_stream_file(download_id, lookup):
+    """locate_file for the stream endpoint, remembered for STREAM_LOCATE_TTL
+    seconds. `lookup()` returns the download dict (or None) on a miss; only
+    completed downloads whose file exists are cached."""
+    now = time.monotonic()
+    cached = _stream_locations.get(download_id)
+    if cached and now - cached[0] < STREAM_LOCATE_TTL:
+        return cached[1], cached[2]
+    download = lookup()
+    if not download or download.get("status") != "done" or not download.get("file"):
+        _stream_locations.pop(download_id, None)
+        return None, None
+    path, size = locate_known_file(download_id, download, download["file"])
+    if path:
+        _stream_locations[download_id] = (now, path, size)
+    else:
+        _stream_locations.pop(download_id, None)
+    return path, size
@@ -29,75 +29,57 @@ class AnalyticsRoutesMixin:
             """Get download analytics data for charts"""
             db = get_db()
             include_deleted = request.args.get("include_deleted", "false").lower() == "true"
-            all_downloads = db.get_all_downloads(include_deleted=include_deleted)
 
             # Get date range from query params (default: last 30 days, 0 = all time)
             days = int(request.args.get("days", 30))
             group_by = request.args.get("group_by", "day")  # 'day' or 'hour'
 
-            from datetime import datetime, timedelta
+            from datetime import date, datetime, timedelta
             from collections import defaultdict
 
             now = datetime.utcnow()
             cutoff = now - timedelta(days=days) if days > 0 else None
 
-            # Filter downloads within date range
-            recent_downloads = []
-            for d in all_downloads:
-                created = d.get("created_at")
-                if created:
-                    try:
-                        dt = datetime.fromisoformat(created.replace('Z', '+00:00')) if isinstance(created, str) else created
-                        dt_naive = dt.replace(tzinfo=None)
-                        if cutoff is None or dt_naive >= cutoff:
-                            recent_downloads.append({**d, '_dt': dt_naive})
-                    except:
-                        pass
-
-            # Group by time period
-            downloads_by_time = defaultdict(lambda: {'count': 0, 'size': 0})
-            downloads_by_source = defaultdict(lambda: {'count': 0, 'size': 0})
-            downloads_by_author = defaultdict(lambda: {'count': 0, 'size': 0})
+            # Counts/sizes come pre-grouped by (hour, source, author, status);
+            # rolling those few groups up is all that's left to do here
+            groups = db.get_download_analytics(since=cutoff, include_deleted=include_deleted)
+
+            # [count, size] pairs; turned into dicts once, when building the response
+            downloads_by_time = defaultdict(lambda: [0, 0])
+            downloads_by_source = defaultdict(lambda: [0, 0])
+            downloads_by_author = defaultdict(lambda: [0, 0])
             downloads_by_status = defaultdict(int)
             hourly_distribution = defaultdict(int)  # Downloads by hour of day (0-23)
 
-            for d in recent_downloads:
-                dt = d['_dt']
-                source = d.get('downloaded_from', 'unknown')
-                status = d.get('status', 'unknown')
-                size = d.get('total_bytes', 0) or 0
-
+            for hour, source, author, status, count, size in groups:
                 # Group by day or hour
-                if group_by == 'hour':
-                    key = dt.strftime('%Y-%m-%d %H:00')
-                else:
-                    key = dt.strftime('%Y-%m-%d')
-
-                downloads_by_time[key]['count'] += 1
-                downloads_by_time[key]['size'] += size
+                totals = downloads_by_time[f"{hour}:00" if group_by == 'hour' else hour[:10]]
+                totals[0] += count
+                totals[1] += size
 
                 # By source
-                downloads_by_source[source]['count'] += 1
-                downloads_by_source[source]['size'] += size
+                totals = downloads_by_source[source]
+                totals[0] += count
+                totals[1] += size
 
                 # By author
-                author = d.get('author') or 'unknown'
-                downloads_by_author[author]['count'] += 1
-                downloads_by_author[author]['size'] += size
+                totals = downloads_by_author[author or 'unknown']
+                totals[0] += count
+                totals[1] += size
 
                 # By status
-                downloads_by_status[status] += 1
+                downloads_by_status[status] += count
 
                 # Hourly distribution (regardless of date)
-                hourly_distribution[dt.hour] += 1
+                hourly_distribution[int(hour[11:13])] += count
 
             # Convert to sorted lists for charts
             time_labels = sorted(downloads_by_time.keys())
             time_data = [
                 {
                     'label': label,
-                    'count': downloads_by_time[label]['count'],
-                    'size': downloads_by_time[label]['size']
+                    'count': downloads_by_time[label][0],
+                    'size': downloads_by_time[label][1]
                 }
                 for label in time_labels
             ]
@@ -108,16 +90,16 @@ class AnalyticsRoutesMixin:
                 if cutoff is not None:
                     start_date = cutoff.date()
                 else:
-                    start_date = datetime.strptime(time_labels[0], '%Y-%m-%d').date()
+                    start_date = date.fromisoformat(time_labels[0])
                 end = now.date()
                 current = start_date
                 while current <= end:
-                    key = current.strftime('%Y-%m-%d')
+                    key = current.isoformat()  # 'YYYY-MM-DD', same as the SQL day labels
                     if key in downloads_by_time:
                         filled_data.append({
                             'label': key,
-                            'count': downloads_by_time[key]['count'],
-                            'size': downloads_by_time[key]['size']
+                            'count': downloads_by_time[key][0],
+                            'size': downloads_by_time[key][1]
                         })
                     else:
                         filled_data.append({'label': key, 'count': 0, 'size': 0})
@@ -126,8 +108,8 @@ class AnalyticsRoutesMixin:
 
             # Sort sources by count
             source_data = [
-                {'source': source, 'count': data['count'], 'size': data['size']}
-                for source, data in sorted(downloads_by_source.items(), key=lambda x: -x[1]['count'])
+                {'source': source, 'count': count, 'size': size}
+                for source, (count, size) in sorted(downloads_by_source.items(), key=lambda x: -x[1][0])
             ]
 
             # Hourly distribution (0-23)
@@ -138,15 +120,15 @@ class AnalyticsRoutesMixin:
 
             # Sort authors by count
             author_data = [
-                {'author': author, 'count': data['count'], 'size': data['size']}
-                for author, data in sorted(downloads_by_author.items(), key=lambda x: -x[1]['count'])
+                {'author': author, 'count': count, 'size': size}
+                for author, (count, size) in sorted(downloads_by_author.items(), key=lambda x: -x[1][0])
             ]
 
             # Summary stats
-            total_downloads = len(recent_downloads)
-            total_size = sum(d.get('total_bytes', 0) or 0 for d in recent_downloads)
-            completed = sum(1 for d in recent_downloads if d.get('status') == 'done')
-            failed = sum(1 for d in recent_downloads if d.get('status') == 'failed')
+            total_downloads = sum(data[0] for data in downloads_by_source.values())
+            total_size = sum(data[1] for data in downloads_by_source.values())
+            completed = downloads_by_status.get('done', 0)
+            failed = downloads_by_status.get('failed', 0)
 
             return jsonify({
                 'time_series': time_data,
@@ -7,7 +7,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from flask import jsonify, request, send_from_directory, Response
 from backend.config import JWT_SECRET
-from backend.database import get_db
+from backend.database import get_db, is_generated_id
 from backend import metrics
 from backend.web_app.base import (
     token_required, get_socketio, get_web_app,
@@ -42,7 +42,7 @@ class DownloadRoutesMixin:
         def get_authors():
             """Get distinct author values"""
             db = get_db()
-            all_downloads = db.get_all_downloads()
+            all_downloads = db.get_download_summaries()
             authors = sorted(set(d.get("author") for d in all_downloads if d.get("author")))
             return jsonify(authors)
 
@@ -54,9 +54,14 @@ class DownloadRoutesMixin:
         @self.app.route("/metrics", methods=["GET"])
         def prometheus_metrics():
             """Prometheus metrics endpoint (no auth required for scraping)"""
-            # Update database stats before returning metrics
-            self._update_prometheus_metrics()
-            return Response(metrics.get_metrics(), mimetype=metrics.get_content_type())
+            # Database stats are refreshed only when the output is re-rendered
+            body, encoding = metrics.get_metrics(request.headers.get('Accept-Encoding', ''),
+                                                 refresh=self._update_prometheus_metrics)
+            response = Response(body, mimetype=metrics.get_content_type())
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+                response.headers['Vary'] = 'Accept-Encoding'
+            return response
 
         @self.app.route("/api/retry", methods=["POST"])
         @token_required
@@ -93,8 +98,7 @@ class DownloadRoutesMixin:
                             download_id,
                             status='downloading',
                             speed=0,
-                            error=None,
-                            updated_at=datetime.utcnow()
+                            error=None
                         )
                         self.emit_status(message_id, 'downloading')
 
@@ -111,8 +115,7 @@ class DownloadRoutesMixin:
                             status='downloading',
                             progress=0,
                             speed=0,
-                            error=None,
-                            updated_at=datetime.utcnow()
+                            error=None
                         )
                         if download.get("message_id"):
                             self.emit_status(download["message_id"], 'downloading')
@@ -126,7 +129,7 @@ class DownloadRoutesMixin:
             db = get_db()
 
             # Check if it's a yt-dlp download (UUID format) or Telegram (numeric string)
-            is_uuid = message_id and '-' in message_id
+            is_uuid = is_generated_id(message_id)
 
             if is_uuid:
                 # VPS and yt-dlp both use UUIDs - distinguish by source
@@ -156,7 +159,7 @@ class DownloadRoutesMixin:
                     )
 
             # Update database status to stopped
-            db.update_download_by_message_id(message_id, status='stopped', speed=0)
+            db.patch_download_by_message_id(message_id, status='stopped', speed=0)
             self.emit_status(message_id, 'stopped')
             return jsonify({"status": "stopped"})
 
@@ -167,7 +170,7 @@ class DownloadRoutesMixin:
             message_id = data.get("message_id")
             db = get_db()
 
-            is_uuid = message_id and '-' in message_id
+            is_uuid = is_generated_id(message_id)
             if is_uuid:
                 return jsonify({"error": "Pause not supported for this download type"}), 400
 
@@ -180,7 +183,7 @@ class DownloadRoutesMixin:
                     self.telegram_downloader.loop
                 )
 
-            db.update_download_by_message_id(message_id, status='paused', speed=0, pending_time=None)
+            db.patch_download_by_message_id(message_id, status='paused', speed=0, pending_time=None)
             self.emit_status(message_id, 'paused')
             return jsonify({"status": "paused"})
 
@@ -191,7 +194,7 @@ class DownloadRoutesMixin:
             message_id = data.get("message_id")
             db = get_db()
 
-            is_uuid = message_id and '-' in message_id
+            is_uuid = is_generated_id(message_id)
             if is_uuid:
                 return jsonify({"error": "Resume not supported for this download type"}), 400
 
@@ -208,7 +211,7 @@ class DownloadRoutesMixin:
                 except Exception as e:
                     return jsonify({"error": f"Failed to restart download: {str(e)}"}), 500
 
-            db.update_download_by_message_id(message_id, status='downloading', speed=0)
+            db.patch_download_by_message_id(message_id, status='downloading', speed=0)
             self.emit_status(message_id, 'downloading')
             return jsonify({"status": "downloading"})
 
@@ -221,7 +224,7 @@ class DownloadRoutesMixin:
             db = get_db()
 
             # Check if it's a yt-dlp download (UUID format) or Telegram (numeric string)
-            is_uuid = message_id and '-' in message_id
+            is_uuid = is_generated_id(message_id)
 
             if is_uuid:
                 # VPS and yt-dlp both use UUIDs - distinguish by source
@@ -245,7 +248,7 @@ class DownloadRoutesMixin:
                 task = self.download_tasks.get(telegram_id)
                 if task and not task.done():
                     task.cancel()
-                    db.update_download_by_message_id(message_id, status='stopped', speed=0)
+                    db.patch_download_by_message_id(message_id, status='stopped', speed=0)
                 self.download_tasks.pop(telegram_id, None)
 
             # Delete the physical file if requested
@@ -10,7 +10,7 @@ from backend.config import JWT_SECRET
 from backend.database import get_db
 from backend import metrics
 from backend.web_app.base import (
-    token_required, get_socketio, get_web_app,
+    token_required, decode_token, get_socketio, get_web_app,
     JWT_EXPIRY_DAYS, PASSWORD_CHANGE_ALLOWED_PATHS, FRONTEND_DIST,
 )
 from backend.web_app.torrent import (
@@ -18,7 +18,15 @@ from backend.web_app.torrent import (
     transmission_rpc, normalize_transmission_url,
 )
 from backend.web_app.vps import load_vps_credentials, annotate_vps_folders, open_vps_sftp
-from backend.web_app.helpers import candidate_file_paths
+from backend.web_app.helpers import candidate_file_paths, locate_known_file, locate_stream_file
+
+
+STREAM_CHUNK_SIZE = 1024 * 1024  # 1MB blocks when the server has no sendfile wrapper
+
+
+def _chunked_file_wrapper(file, buffer_size=8192):
+    from werkzeug.wsgi import FileWrapper
+    return FileWrapper(file, max(buffer_size, STREAM_CHUNK_SIZE))
 
 
 class MediaRoutesMixin:
@@ -41,31 +49,33 @@ class MediaRoutesMixin:
             if not file_name:
                 return jsonify({"exists": False, "error": "No file name"})
 
-            # Check the source's destination folder + common download locations
-            possible_paths = candidate_file_paths(download, file_name)
-
-            for file_path in possible_paths:
-                if file_path.exists():
-                    # Check if it's a video file
-                    video_extensions = {'.mp4', '.mkv', '.webm', '.avi', '.mov', '.m4v', '.flv', '.wmv'}
-                    if file_path.suffix.lower() in video_extensions:
-                        # Reset file_deleted flag if file exists
+            # Every candidate shares the file name, so the extension check
+            # needs no disk access
+            from backend.file_meta import is_video_file
+            if is_video_file(file_name):
+                # Last known location, else the source's destination folder
+                # + common download locations
+                file_path, file_size = locate_known_file(download_id, download, file_name)
+                if file_path:
+                    # Reset file_deleted flag if file exists (only written on change)
+                    if download.get("file_deleted"):
                         db.update_download_by_id(download_id, file_deleted=False)
-                        return jsonify({
-                            "exists": True,
-                            "path": str(file_path),
-                            "size": file_path.stat().st_size,
-                            "name": file_name
-                        })
+                    return jsonify({
+                        "exists": True,
+                        "path": str(file_path),
+                        "size": file_size,
+                        "name": file_name
+                    })
 
             # Mark file as deleted in database
-            db.update_download_by_id(download_id, file_deleted=True)
+            if not download.get("file_deleted"):
+                db.update_download_by_id(download_id, file_deleted=True)
             return jsonify({"exists": False, "error": "File not found"})
 
         @self.app.route("/api/video/stream/<int:download_id>", methods=["GET"])
         def stream_video(download_id):
             """Stream a video file for playback"""
-            from flask import Response, request
+            from flask import send_file
             import mimetypes
 
             # Accept token from query param (for video element) or header
@@ -79,96 +89,29 @@ class MediaRoutesMixin:
                 return jsonify({'error': 'Token is missing'}), 401
 
             try:
-                jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+                decode_token(token)
             except jwt.ExpiredSignatureError:
                 return jsonify({'error': 'Token has expired'}), 401
             except jwt.InvalidTokenError:
                 return jsonify({'error': 'Invalid token'}), 401
 
-            db = get_db()
-            download = db.get_download_by_id(download_id)
-
-            if not download or download.get("status") != "done":
-                return jsonify({"error": "Video not available"}), 404
-
-            file_name = download.get("file")
-            if not file_name:
-                return jsonify({"error": "No file name"}), 404
-
-            # Find the file
-            file_path = None
-            possible_paths = candidate_file_paths(download, file_name)
-
-            for path in possible_paths:
-                if path.exists():
-                    file_path = path
-                    break
+            # Find the file (cached briefly across a player's Range requests)
+            file_path, file_size = locate_stream_file(
+                download_id, lambda: get_db().get_download_by_id(download_id))
 
             if not file_path:
-                return jsonify({"error": "File not found"}), 404
+                return jsonify({"error": "Video not available"}), 404
 
-            # Get file size and mime type
-            file_size = file_path.stat().st_size
+            # Get mime type
             mime_type = mimetypes.guess_type(str(file_path))[0] or 'video/mp4'
 
-            # Handle range requests for seeking
-            range_header = request.headers.get('Range')
-
-            if range_header:
-                # Parse range header
-                byte_start = 0
-                byte_end = file_size - 1
-
-                range_match = range_header.replace('bytes=', '').split('-')
-                if range_match[0]:
-                    byte_start = int(range_match[0])
-                if len(range_match) > 1 and range_match[1]:
-                    byte_end = int(range_match[1])
-
-                content_length = byte_end - byte_start + 1
-
-                def generate():
-                    with open(file_path, 'rb') as f:
-                        f.seek(byte_start)
-                        remaining = content_length
-                        chunk_size = 1024 * 1024  # 1MB chunks
-                        while remaining > 0:
-                            chunk = f.read(min(chunk_size, remaining))
-                            if not chunk:
-                                break
-                            remaining -= len(chunk)
-                            yield chunk
-
-                response = Response(
-                    generate(),
-                    status=206,
-                    mimetype=mime_type,
-                    direct_passthrough=True
-                )
-                response.headers['Content-Range'] = f'bytes {byte_start}-{byte_end}/{file_size}'
-                response.headers['Accept-Ranges'] = 'bytes'
-                response.headers['Content-Length'] = content_length
-                return response
-            else:
-                # Full file request
-                def generate():
-                    with open(file_path, 'rb') as f:
-                        chunk_size = 1024 * 1024  # 1MB chunks
-                        while True:
-                            chunk = f.read(chunk_size)
-                            if not chunk:
-                                break
-                            yield chunk
-
-                response = Response(
-                    generate(),
-                    status=200,
-                    mimetype=mime_type,
-                    direct_passthrough=True
-                )
-                response.headers['Accept-Ranges'] = 'bytes'
-                response.headers['Content-Length'] = file_size
-                return response
+            # send_file answers Range requests (206 + Content-Range, 416 when
+            # unsatisfiable) and hands the open file to the server's
+            # wsgi.file_wrapper, which gunicorn/uwsgi send with sendfile().
+            # Werkzeug's own server has none, and its fallback reads 8 KiB
+            # blocks, so stream STREAM_CHUNK_SIZE blocks there instead
+            request.environ.setdefault('wsgi.file_wrapper', _chunked_file_wrapper)
+            return send_file(file_path, mimetype=mime_type, conditional=True, max_age=0)
 
         # Thumbnail API
         @self.app.route("/api/thumbs/<int:download_id>", methods=["GET"])
@@ -194,7 +137,7 @@ class MediaRoutesMixin:
             if not token:
                 return jsonify({'error': 'Token is missing'}), 401
             try:
-                jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+                decode_token(token)
             except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
                 return jsonify({'error': 'Invalid token'}), 401
 
@@ -273,8 +216,7 @@ class MediaRoutesMixin:
             )
 
             db = get_db()
-            downloads = db.get_all_downloads()
-            completed = [d for d in downloads if d['status'] == 'done' and not d.get('deleted_at')]
+            completed = [d for d in db.iter_downloads() if d['status'] == 'done' and not d.get('deleted_at')]
 
             stats = {
                 'generated': 0,
@@ -288,7 +230,12 @@ class MediaRoutesMixin:
             }
 
             import asyncio as _asyncio
-            loop = _asyncio.new_event_loop()
+
+            def run(coro):
+                # Reuse the shared background loop rather than a throwaway one
+                if self.event_loop is not None:
+                    return _asyncio.run_coroutine_threadsafe(coro, self.event_loop).result()
+                return _asyncio.run(coro)
 
             for dl in completed:
                 file_name = dl.get('file')
@@ -328,7 +275,7 @@ class MediaRoutesMixin:
                     duration = file_meta.get('duration') if isinstance(file_meta, dict) else None
 
                 if not duration:
-                    probe_data = loop.run_until_complete(probe_video(str(file_path)))
+                    probe_data = run(probe_video(str(file_path)))
                     if probe_data:
                         meta = extract_meta(probe_data)
                         if meta.get('video'):
@@ -340,12 +287,11 @@ class MediaRoutesMixin:
                     stats['no_duration'] += 1
                     continue
 
-                count = loop.run_until_complete(gen_thumbs(dl_id, str(file_path), duration))
+                count = run(gen_thumbs(dl_id, str(file_path), duration))
                 if count:
                     stats['generated'] += 1
                 else:
                     stats['failed'] += 1
 
-            loop.close()
             return jsonify(stats)
 
@@ -23,6 +23,23 @@ from backend.web_app.helpers import candidate_file_paths
 
 _NETSCAPE_HEADER = "# Netscape HTTP Cookie File"
 
+# The project-root file YtdlpDownloader.COOKIES_FILE points yt-dlp at
+COOKIES_PATH = Path(__file__).resolve().parents[3] / 'cookies.txt'
+_cookies_cache = (None, "")  # (st_mtime_ns, content) of the last read
+
+
+def _read_cookies() -> str:
+    """COOKIES_PATH's content ('' when missing), re-read only when its
+    mtime changes."""
+    global _cookies_cache
+    try:
+        mtime = COOKIES_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return ""
+    if _cookies_cache[0] != mtime:
+        _cookies_cache = (mtime, COOKIES_PATH.read_text())
+    return _cookies_cache[1]
+
 
 def _normalize_netscape_cookies(content: str) -> str:
     """Make pasted cookies loadable by yt-dlp's MozillaCookieJar.
@@ -49,26 +66,24 @@ class SettingsRoutesMixin:
         @token_required
         def get_cookies():
             """Get current cookies content"""
-            cookies_path = Path(__file__).parent.parent.parent / 'cookies.txt'
-            if cookies_path.exists():
-                return jsonify({"cookies": cookies_path.read_text()})
-            return jsonify({"cookies": ""})
+            return jsonify({"cookies": _read_cookies()})
 
         @self.app.route("/api/settings/cookies", methods=["POST"])
         @token_required
         def save_cookies():
             """Save cookies content"""
+            global _cookies_cache
             data = request.json
             cookies_content = data.get("cookies", "")
-            cookies_path = Path(__file__).parent.parent.parent / 'cookies.txt'
 
             try:
                 if cookies_content.strip():
-                    cookies_path.write_text(_normalize_netscape_cookies(cookies_content))
+                    COOKIES_PATH.write_text(_normalize_netscape_cookies(cookies_content))
                 else:
                     # Delete file if empty
-                    if cookies_path.exists():
-                        cookies_path.unlink()
+                    COOKIES_PATH.unlink(missing_ok=True)
+                # A rewrite within the mtime granularity must not serve stale text
+                _cookies_cache = (None, "")
                 return jsonify({"status": "saved"})
             except Exception as e:
                 return jsonify({"error": str(e)}), 500
@@ -192,7 +192,7 @@ class VpsBrowseRoutesMixin:
                 watch_folders = [wf for wf in watch_folders if not wf.get("is_secured")]
             # Map existing VPS downloads by remote path for live status
             existing = {}
-            for d in db.get_all_downloads():
+            for d in db.iter_downloads():
                 if d.get("downloaded_from") == "vps" and d.get("url"):
                     existing[d["url"]] = d
 
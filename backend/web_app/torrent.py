@@ -46,11 +46,12 @@ def read_torrent_settings() -> dict:
 
     Migrates the legacy flat Transmission shape (top-level `url`) into
     {transmission: <old>, telegram_default: 'transmission'}."""
+    from backend.utils import json_loads
     raw = get_db().get_setting("torrent_config")
     if not raw:
         return {"transmission": {}, "qbittorrent": {}, "telegram_default": None}
     try:
-        cfg = json.loads(raw)
+        cfg = json_loads(raw)
     except Exception:
         return {"transmission": {}, "qbittorrent": {}, "telegram_default": None}
     if "url" in cfg and "transmission" not in cfg and "qbittorrent" not in cfg:
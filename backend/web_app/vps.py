@@ -1,5 +1,4 @@
 """VPS SSH/SFTP connection helpers."""
-import json
 from backend.database import get_db
 
 
@@ -8,12 +7,12 @@ def load_vps_credentials():
 
     Returns a dict {host, port, username, password} or None if not configured.
     """
-    from backend.utils import decrypt_secret
+    from backend.utils import decrypt_secret, json_loads
     raw = get_db().get_setting("vps_config")
     if not raw:
         return None
     try:
-        cfg = json.loads(raw)
+        cfg = json_loads(raw)
     except Exception:
         return None
     host = cfg.get("host")
@@ -12,12 +12,15 @@ from pathlib import Path
 from urllib.parse import urlparse
 from backend.config import DOWNLOAD_DIR
 from backend.database import get_db, generate_uuid
-from backend.web_app import get_socketio
+from backend.web_app import queue_emit
 from backend import metrics
 from backend.file_meta import poll_and_extract_meta, is_video_file
 
 logger = logging.getLogger(__name__)
 
+# Characters invalid in filenames (incl. ASCII control chars), for str.translate
+_FN_DELETE = str.maketrans('', '', '<>:"/\\|?*' + ''.join(map(chr, range(32))))
+
 
 class YtdlpDownloader:
     # yt-dlp binary path
@@ -189,42 +192,26 @@ class YtdlpDownloader:
 
     def emit_progress(self, message_id: str, progress: float, downloaded_bytes: int,
                       total_bytes: int, speed: float, pending_time: float | None):
-        """Emit progress update for a specific download"""
-        socketio = get_socketio()
-        if socketio:
-            socketio.emit('download:progress', {
-                'message_id': message_id,
-                'progress': progress,
-                'downloaded_bytes': downloaded_bytes,
-                'total_bytes': total_bytes,
-                'speed': speed,
-                'pending_time': pending_time
-            })
-            # Also emit updated stats
-            from backend.web_app import get_web_app
-            web_app = get_web_app()
-            if web_app:
-                web_app.emit_stats()
+        """Emit progress update for a specific download (and updated stats)"""
+        queue_emit('download:progress', {
+            'message_id': message_id,
+            'progress': progress,
+            'downloaded_bytes': downloaded_bytes,
+            'total_bytes': total_bytes,
+            'speed': speed,
+            'pending_time': pending_time
+        }, with_stats=True)
 
     def emit_status(self, message_id: str, status: str, error: str | None = None):
         """Emit status change for a specific download"""
-        socketio = get_socketio()
-        if socketio:
-            data = {'message_id': message_id, 'status': status}
-            if error:
-                data['error'] = error
-            socketio.emit('download:status', data)
+        data = {'message_id': message_id, 'status': status}
+        if error:
+            data['error'] = error
+        queue_emit('download:status', data)
 
     def emit_new_download(self, download: dict):
-        """Emit new download added event"""
-        socketio = get_socketio()
-        if socketio:
-            socketio.emit('download:new', download)
-            # Also emit updated stats
-            from backend.web_app import get_web_app
-            web_app = get_web_app()
-            if web_app:
-                web_app.emit_stats()
+        """Emit new download added event (and updated stats)"""
+        queue_emit('download:new', download, with_stats=True)
 
     def parse_progress(self, line: str) -> dict | None:
         """Parse yt-dlp progress output"""
@@ -283,7 +270,7 @@ class YtdlpDownloader:
             def progress_callback(progress, downloaded, total):
                 # Update progress in database and emit to frontend
                 speed = 0  # Can't easily calculate speed here
-                db.update_download_by_message_id(
+                db.patch_download_by_message_id(
                     message_id,
                     progress=progress,
                     downloaded_bytes=downloaded,
@@ -335,7 +322,7 @@ class YtdlpDownloader:
         print(f"[yt-dlp] custom_title parameter: {custom_title}")
         if custom_title:
             # Sanitize custom title for filename (remove invalid chars)
-            safe_title = re.sub(r'[<>:"/\\|?*]', '', custom_title)
+            safe_title = custom_title.translate(_FN_DELETE).strip()
             output_template = str(output_dir / f"{safe_title}.%(ext)s")
             print(f"[yt-dlp] Using custom title, output_template: {output_template}")
         else:
@@ -374,6 +361,7 @@ class YtdlpDownloader:
             print(f"[yt-dlp] Process started: PID {process.pid}")
 
             self.processes[message_id] = process
+            loop = asyncio.get_running_loop()
             last_update = 0
 
             async for line in process.stdout:
@@ -388,7 +376,7 @@ class YtdlpDownloader:
                 # Parse progress
                 progress_info = self.parse_progress(line_str)
                 if progress_info:
-                    now = datetime.now().timestamp()
+                    now = loop.time()
 
                     # Track total bytes for metrics
                     if progress_info.get('total_bytes'):
@@ -401,7 +389,7 @@ class YtdlpDownloader:
                         if progress_info.get('complete'):
                             continue
 
-                        db.update_download_by_message_id(
+                        db.patch_download_by_message_id(
                             message_id,
                             progress=progress_info['progress'],
                             downloaded_bytes=progress_info['downloaded_bytes'],
@@ -423,11 +411,11 @@ class YtdlpDownloader:
                 if '[download] Destination:' in line_str:
                     filename = line_str.split('[download] Destination:')[-1].strip()
                     filename = os.path.basename(filename)
-                    db.update_download_by_message_id(message_id, file=filename)
+                    db.patch_download_by_message_id(message_id, file=filename)
 
                 # Check for already downloaded
                 if 'has already been downloaded' in line_str:
-                    db.update_download_by_message_id(
+                    db.patch_download_by_message_id(
                         message_id,
                         status='done',
                         progress=100,
@@ -443,7 +431,7 @@ class YtdlpDownloader:
             print(f"[yt-dlp] Process exited with code: {process.returncode}")
 
             if process.returncode == 0:
-                db.update_download_by_message_id(
+                db.patch_download_by_message_id(
                     message_id,
                     status='done',
                     progress=100,
@@ -462,7 +450,7 @@ class YtdlpDownloader:
                 if browser_result.get('success'):
                     # Browser download succeeded
                     filename = os.path.basename(browser_result.get('file_path', ''))
-                    db.update_download_by_message_id(
+                    db.patch_download_by_message_id(
                         message_id,
                         status='done',
                         progress=100,
@@ -477,7 +465,7 @@ class YtdlpDownloader:
                 else:
                     # Both methods failed
                     error_msg = browser_result.get('error', 'Download failed (yt-dlp and browser fallback)')
-                    db.update_download_by_message_id(
+                    db.patch_download_by_message_id(
                         message_id,
                         status='failed',
                         speed=0,
@@ -497,14 +485,14 @@ class YtdlpDownloader:
                 except asyncio.TimeoutError:
                     self.processes[message_id].kill()
 
-            db.update_download_by_message_id(message_id, status='stopped', speed=0)
+            db.patch_download_by_message_id(message_id, status='stopped', speed=0)
             self.emit_status(message_id, 'stopped')
             metrics.record_download_stopped(source)
         except Exception as e:
             print(f"[yt-dlp] Download error: {e}")
             import traceback
             traceback.print_exc()
-            db.update_download_by_message_id(
+            db.patch_download_by_message_id(
                 message_id,
                 status='failed',
                 speed=0,
@@ -100,8 +100,7 @@ def main():
     print(f"Connecting to database: {DATABASE_URL[:30]}...")
     db = DatabaseManager(DATABASE_URL)
 
-    session = db.get_session()
-    try:
+    with db.session_scope() as session:
         # Get all completed downloads that don't have file_meta yet
         downloads = session.query(Download).filter(
             Download.status == 'done',
@@ -153,9 +152,6 @@ def main():
         session.commit()
         print(f"\nDone! Updated: {updated}, Skipped: {skipped}, Not video: {not_video}, File not found: {not_found}")
 
-    finally:
-        db.close_session()
-
 
 if __name__ == '__main__':
     main()
@@ -28,8 +28,7 @@ async def async_main():
     init_database(DATABASE_URL)
     db = DatabaseManager(DATABASE_URL)
 
-    session = db.get_session()
-    try:
+    with db.session_scope() as session:
         downloads = session.query(Download).filter(
             Download.status == 'done',
             Download.deleted_at == None,
@@ -129,9 +128,6 @@ async def async_main():
         print(f"  Not video: {stats['not_video']}")
         print(f"  Failed: {stats['failed']}")
 
-    finally:
-        db.close_session()
-
 
 def main():
     asyncio.run(async_main())
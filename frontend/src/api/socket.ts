@@ -31,6 +31,8 @@ export interface MetaUpdate {
 
 export interface SocketHandlers {
   onProgress: (data: ProgressUpdate) => void;
+  /** Latest progress of every download that ticked in the last interval. */
+  onProgressBatch: (data: ProgressUpdate[]) => void;
   onStatus: (data: StatusUpdate) => void;
   onNew: (data: Download) => void;
   onDeleted: (data: DeletedUpdate) => void;
@@ -64,6 +66,7 @@ export function connectSocket(handlers: SocketHandlers): Socket {
 
   // Listen for specific events
   socket.on('download:progress', handlers.onProgress);
+  socket.on('downloads:progress', handlers.onProgressBatch);
   socket.on('download:status', handlers.onStatus);
   socket.on('download:new', handlers.onNew);
   socket.on('download:deleted', handlers.onDeleted);
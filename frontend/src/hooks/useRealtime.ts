@@ -1,6 +1,6 @@
 import { useEffect } from 'react';
 import { useQueryClient, type InfiniteData } from '@tanstack/react-query';
-import { connectSocket, disconnectSocket, type StatusUpdate } from '../api/socket';
+import { connectSocket, disconnectSocket, type ProgressUpdate, type StatusUpdate } from '../api/socket';
 import { qk } from '../api/queryKeys';
 import type { Download, DownloadsResponse } from '../types';
 
@@ -16,7 +16,8 @@ export interface RealtimeCallbacks {
 /**
  * Bridges Socket.IO events into the React Query cache. Mount once (in Layout).
  * High-frequency events (progress/status/meta/new/deleted) patch the cache
- * directly with setQueriesData — no refetch. A (re)connect does a one-time
+ * directly with setQueriesData — no refetch; batched progress patches every
+ * download it carries in one pass. A (re)connect does a one-time
  * invalidate to resync after any missed events. Optional callbacks let the UI
  * surface toasts / connection state without re-subscribing to the socket.
  */
@@ -44,19 +45,28 @@ export function useRealtime(cb: RealtimeCallbacks = {}) {
     const mergeById = (messageId: string, patch: Partial<Download>) =>
       patchDownloads(list => list.map(d => (d.message_id === messageId ? { ...d, ...patch } : d)));
 
+    const progressPatch = (p: ProgressUpdate): Partial<Download> => ({
+      progress: p.progress,
+      downloaded_bytes: p.downloaded_bytes,
+      total_bytes: p.total_bytes,
+      speed: p.speed,
+      pending_time: p.pending_time,
+    });
+
     connectSocket({
       onNew: (download) => {
         patchDownloads(list => (list.some(d => d.message_id === download.message_id) ? list : [download, ...list]));
         onNewDownload?.(download);
       },
       onDeleted: ({ message_id }) => patchDownloads(list => list.filter(d => d.message_id !== message_id)),
-      onProgress: (p) => mergeById(p.message_id, {
-        progress: p.progress,
-        downloaded_bytes: p.downloaded_bytes,
-        total_bytes: p.total_bytes,
-        speed: p.speed,
-        pending_time: p.pending_time,
-      }),
+      onProgress: (p) => mergeById(p.message_id, progressPatch(p)),
+      onProgressBatch: (batch) => {
+        const byId = new Map(batch.map(p => [p.message_id, p]));
+        patchDownloads(list => list.map(d => {
+          const p = byId.get(d.message_id);
+          return p ? { ...d, ...progressPatch(p) } : d;
+        }));
+      },
       onStatus: (s) => {
         const dl = findDownload(s.message_id);
         mergeById(s.message_id, { status: s.status, error: s.error || null, speed: 0 });